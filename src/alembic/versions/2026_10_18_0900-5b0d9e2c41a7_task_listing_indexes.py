@@ -0,0 +1,27 @@
+"""task listing indexes
+
+Revision ID: 5b0d9e2c41a7
+Revises: aaa4d698d4d6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5b0d9e2c41a7"
+down_revision = "aaa4d698d4d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_ProjectUserLink_user_id"), "ProjectUserLink", ["user_id"], unique=False,
+    )
+    op.create_index(op.f("ix_Task_project_id"), "Task", ["project_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_Task_project_id"), table_name="Task")
+    op.drop_index(op.f("ix_ProjectUserLink_user_id"), table_name="ProjectUserLink")
@@ -0,0 +1,51 @@
+"""image renditions
+
+Revision ID: 8c3f1a7d2e90
+Revises: 5b0d9e2c41a7
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "8c3f1a7d2e90"
+down_revision = "5b0d9e2c41a7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ImageRendition",
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("file_format", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("image_media_id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("media_id", sqlmodel.sql.sqltypes.GUID(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["image_media_id"],
+            ["ImageMedia.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["media_id"],
+            ["Media.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_ImageRendition_id"), "ImageRendition", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_ImageRendition_image_media_id"), "ImageRendition", ["image_media_id"], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_ImageRendition_image_media_id"), table_name="ImageRendition")
+    op.drop_index(op.f("ix_ImageRendition_id"), table_name="ImageRendition")
+    op.drop_table("ImageRendition")
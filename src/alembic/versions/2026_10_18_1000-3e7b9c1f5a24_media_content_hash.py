@@ -0,0 +1,30 @@
+"""media content hash
+
+Revision ID: 3e7b9c1f5a24
+Revises: 8c3f1a7d2e90
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = "3e7b9c1f5a24"
+down_revision = "8c3f1a7d2e90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Media",
+        sa.Column("content_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    )
+    op.create_index(op.f("ix_Media_content_hash"), "Media", ["content_hash"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_Media_content_hash"), table_name="Media")
+    op.drop_column("Media", "content_hash")
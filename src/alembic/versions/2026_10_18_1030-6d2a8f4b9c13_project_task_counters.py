@@ -0,0 +1,169 @@
+"""project task counters
+
+Revision ID: 6d2a8f4b9c13
+Revises: 3e7b9c1f5a24
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6d2a8f4b9c13"
+down_revision = "3e7b9c1f5a24"
+branch_labels = None
+depends_on = None
+
+PERCENT_COMPLETED_EXPRESSION = (
+    "CASE WHEN tasks_total = 0 THEN 0 "
+    "ELSE round(tasks_done::numeric / tasks_total, 2)::double precision END"
+)
+
+# Applies the changes of a whole statement with one update per touched project. Transition
+# tables can not be shared by several events, so every event has its own trigger.
+APPLY_TASK_COUNTER_DELTAS = """
+CREATE FUNCTION apply_task_counter_deltas() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public."Project" AS p
+        SET tasks_total = p.tasks_total + d.total, tasks_done = p.tasks_done + d.done
+        FROM (
+            SELECT project_id, count(*) AS total, count(*) FILTER (WHERE done) AS done
+            FROM new_tasks
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id
+        ) AS d
+        WHERE p.id = d.project_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE public."Project" AS p
+        SET tasks_total = p.tasks_total - d.total, tasks_done = p.tasks_done - d.done
+        FROM (
+            SELECT project_id, count(*) AS total, count(*) FILTER (WHERE done) AS done
+            FROM old_tasks
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id
+        ) AS d
+        WHERE p.id = d.project_id;
+    ELSE
+        UPDATE public."Project" AS p
+        SET tasks_total = p.tasks_total + d.total, tasks_done = p.tasks_done + d.done
+        FROM (
+            SELECT project_id, sum(total) AS total, sum(done) AS done
+            FROM (
+                SELECT project_id, 1 AS total, done::int AS done FROM new_tasks
+                UNION ALL
+                SELECT project_id, -1 AS total, -done::int AS done FROM old_tasks
+            ) AS changes
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id
+            HAVING sum(total) <> 0 OR sum(done) <> 0
+        ) AS d
+        WHERE p.id = d.project_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TASK_COUNTER_TRIGGERS = {
+    "task_counters_insert_trigger": "AFTER INSERT ON public.\"Task\" "
+    "REFERENCING NEW TABLE AS new_tasks",
+    "task_counters_update_trigger": "AFTER UPDATE ON public.\"Task\" "
+    "REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks",
+    "task_counters_delete_trigger": "AFTER DELETE ON public.\"Task\" "
+    "REFERENCING OLD TABLE AS old_tasks",
+}
+
+# Previously created by scripts/sql/task_update_percent_completed_trigger.sql
+UPDATE_PROJECT_PERCENT_COMPLETED = """
+CREATE OR REPLACE FUNCTION update_project_percent_completed()
+RETURNS TRIGGER AS $$
+DECLARE
+    total_tasks INTEGER;
+    completed_tasks INTEGER;
+    coefficient_completed DECIMAL(5,2);
+BEGIN
+    SELECT COUNT(*) INTO total_tasks FROM public."Task"
+    WHERE public."Task".project_id = NEW.project_id;
+    SELECT COUNT(*) INTO completed_tasks FROM public."Task"
+    WHERE public."Task".project_id = NEW.project_id AND public."Task".done = true;
+    IF total_tasks = 0 THEN
+        coefficient_completed := 0.0;
+    ELSE
+        coefficient_completed := ROUND(completed_tasks::numeric / total_tasks::numeric, 2);
+    END IF;
+    UPDATE public."Project" SET percent_completed = coefficient_completed
+    WHERE public."Project".id = NEW.project_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS task_update_percent_completed_trigger ON public."Task"')
+    op.execute("DROP FUNCTION IF EXISTS update_project_percent_completed()")
+
+    op.add_column(
+        "Project",
+        sa.Column("tasks_total", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "Project",
+        sa.Column("tasks_done", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE public."Project" AS p
+        SET tasks_total = c.total, tasks_done = c.done
+        FROM (
+            SELECT project_id, count(*) AS total, count(*) FILTER (WHERE done) AS done
+            FROM public."Task"
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id
+        ) AS c
+        WHERE p.id = c.project_id
+        """,
+    )
+
+    op.drop_column("Project", "percent_completed")
+    op.add_column(
+        "Project",
+        sa.Column(
+            "percent_completed",
+            sa.Float(),
+            sa.Computed(PERCENT_COMPLETED_EXPRESSION, persisted=True),
+            nullable=False,
+        ),
+    )
+
+    op.execute(APPLY_TASK_COUNTER_DELTAS)
+    for name, event in TASK_COUNTER_TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {event} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_task_counter_deltas()",
+        )
+
+
+def downgrade() -> None:
+    for name in TASK_COUNTER_TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON public."Task"')
+    op.execute("DROP FUNCTION IF EXISTS apply_task_counter_deltas()")
+
+    op.drop_column("Project", "percent_completed")
+    op.add_column(
+        "Project",
+        sa.Column("percent_completed", sa.Float(), server_default="0", nullable=False),
+    )
+    op.execute(f'UPDATE public."Project" SET percent_completed = {PERCENT_COMPLETED_EXPRESSION}')
+    op.alter_column("Project", "percent_completed", server_default=None)
+    op.drop_column("Project", "tasks_done")
+    op.drop_column("Project", "tasks_total")
+
+    op.execute(UPDATE_PROJECT_PERCENT_COMPLETED)
+    op.execute(
+        "CREATE TRIGGER task_update_percent_completed_trigger "
+        'AFTER INSERT OR UPDATE OR DELETE ON public."Task" '
+        "FOR EACH ROW EXECUTE FUNCTION update_project_percent_completed()",
+    )
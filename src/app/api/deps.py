@@ -1,22 +1,25 @@
 from collections.abc import AsyncGenerator, Callable
+from datetime import timedelta
+from functools import lru_cache
 
-import redis.asyncio as aioredis
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, MissingRequiredClaimError
 from loguru import logger
 from redis.asyncio import Redis
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import InvalidRequestError, SQLAlchemyError
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import repository
 from app.core.config import settings
 from app.core.security import decode_token
+from app.db.redis_pool import get_redis_pool
 from app.db.session import SessionLocal
 from app.models.user_model import User
-from app.schemas.common_schema import IMetaGeneral, TokenType
+from app.schemas.common_schema import TokenType
 from app.utils.minio_client import MinioClient
-from app.utils.token import get_valid_tokens
+from app.utils.principal_cache import cache_principal, get_cached_principal
+from app.utils.token import get_token_id, validate_token
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.srv.API_PREFIX}/auth/token",
@@ -25,14 +28,7 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 
 async def get_redis_client() -> Redis:
-    redis = await aioredis.from_url(
-        f"redis://{settings.database.REDIS_HOST}:{settings.database.REDIS_PORT}",
-        password=settings.database.REDIS_PASSWORD,
-        max_connections=10,
-        encoding="utf8",
-        decode_responses=True,
-    )
-    return redis
+    return Redis(connection_pool=get_redis_pool())
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -50,9 +46,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def get_general_meta() -> IMetaGeneral:
-    current_roles = await repository.role.get_multi(skip=0, limit=100)
-    return IMetaGeneral(roles=current_roles)
+async def get_cached_user(user_id: str, access_token: str) -> User | None:
+    """Returns the cached user attached to the current session without a database query."""
+    user = get_cached_principal(user_id, access_token)
+    if not user:
+        return None
+
+    try:
+        return await repository.user.get_db().session.merge(user, load=False)
+    except InvalidRequestError:
+        # The cached instance has pending changes, load a fresh one instead
+        return None
 
 
 def get_current_user(required_roles: list[str] = None) -> Callable[[], User]:
@@ -81,26 +85,27 @@ def get_current_user(required_roles: list[str] = None) -> Callable[[], User]:
             )
 
         user_id = payload["sub"]
-        valid_access_tokens = await get_valid_tokens(redis_client, user_id, TokenType.ACCESS)
-        if valid_access_tokens and access_token not in valid_access_tokens:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Could not validate credentials",
-            )
-        user: User = await repository.user.get(id=user_id)
+        user = await get_cached_user(user_id, access_token)
         if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+            token_id = get_token_id(access_token, payload)
+            if not await validate_token(redis_client, user_id, TokenType.ACCESS, token_id):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Could not validate credentials",
+                )
+            user: User = await repository.user.get(id=user_id, profile="bare")
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+
+            if user.is_active:
+                cache_principal(user_id, access_token, user)
 
         if not user.is_active:
             raise HTTPException(status_code=400, detail="Inactive user")
 
         if required_roles:
-            is_valid_role = False
-            for role in required_roles:
-                if role == user.role.name:
-                    is_valid_role = True
-
-            if not is_valid_role:
+            role = await repository.role.get_cached(id=user.role_id) if user.role_id else None
+            if not role or role.name not in required_roles:
                 raise HTTPException(
                     status_code=403,
                     detail=f"""Role '{required_roles}' is required for this action""",
@@ -111,11 +116,16 @@ def get_current_user(required_roles: list[str] = None) -> Callable[[], User]:
     return current_user
 
 
+@lru_cache
 def minio_auth() -> MinioClient:
+    """Returns the process-wide client, the bucket check only runs on first use."""
     minio_client = MinioClient(
         access_key=settings.file_storage.MINIO_ROOT_USER,
         secret_key=settings.file_storage.MINIO_ROOT_PASSWORD,
         bucket_name=settings.file_storage.MINIO_BUCKET,
         minio_url=settings.file_storage.MINIO_URL,
+        url_expires=timedelta(minutes=settings.file_storage.MINIO_URL_EXPIRE_MINUTES),
+        url_cache_ttl=settings.file_storage.MINIO_URL_CACHE_TTL_SECONDS,
+        url_cache_size=settings.file_storage.MINIO_URL_CACHE_MAX_SIZE,
     )
     return minio_client
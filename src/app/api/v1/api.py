@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, project, role, task, user
+from app.api.v1.endpoints import auth, project, role, system, task, user
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -8,3 +8,4 @@ api_router.include_router(user.router, prefix="/user", tags=["user"])
 api_router.include_router(role.router, prefix="/role", tags=["role"])
 api_router.include_router(project.router, prefix="/project", tags=["project"])
 api_router.include_router(task.router, prefix="/task", tags=["task"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
@@ -10,7 +10,7 @@ from app import repository
 from app.api import deps
 from app.core import security
 from app.core.config import settings
-from app.core.security import decode_token, get_password_hash, verify_password
+from app.core.security import decode_token
 from app.deps import user_deps
 from app.models.user_model import User
 from app.schemas.auth_schema import (
@@ -21,14 +21,22 @@ from app.schemas.auth_schema import (
     IAuthRegister,
     IAuthResetPassword,
 )
-from app.schemas.common_schema import IMetaGeneral, TokenType
+from app.schemas.common_schema import TokenType
 from app.schemas.response_schema import IPostResponseBase, create_response
 from app.schemas.token_schema import RefreshToken, ResetToken, Token, TokenRead
 from app.schemas.user_schema import IUserCreate, IUserRead
-from app.tasks import send_verification_email
 from app.utils.exceptions import EmailNotFoundException
-from app.utils.otp import add_otp_to_redis, delete_otps, get_valid_otp
-from app.utils.token import add_token_to_redis, delete_tokens, get_valid_tokens
+from app.utils.mail_queue import enqueue_verification_email
+from app.utils.otp import redeem_otp, replace_otp
+from app.utils.password_hasher import password_hasher
+from app.utils.token import (
+    TokenGrant,
+    add_tokens_if_tracked,
+    get_token_id,
+    replace_tokens,
+    revoke_tokens,
+    validate_token,
+)
 
 router = APIRouter()
 
@@ -36,7 +44,6 @@ router = APIRouter()
 @router.post("/login")
 async def login(
     login_user: IAuthLogin,
-    meta_data: IMetaGeneral = Depends(deps.get_general_meta),
     redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IPostResponseBase[Token]:
     """Authenticate a user with email and password.
@@ -60,6 +67,7 @@ async def login(
     refresh_token_expires = timedelta(minutes=settings.srv.REFRESH_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(user.id, expires_delta=access_token_expires)
     refresh_token = security.create_refresh_token(user.id, expires_delta=refresh_token_expires)
+    await repository.image.load_renditions(images=[user.image])
     data = Token(
         access_token=access_token,
         token_type="bearer",
@@ -67,28 +75,15 @@ async def login(
         user=user,
     )
 
-    valid_access_tokens = await get_valid_tokens(redis_client, user.id, TokenType.ACCESS)
-    if valid_access_tokens:
-        await add_token_to_redis(
-            redis_client,
-            user,
-            access_token,
-            TokenType.ACCESS,
-            settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES,
-        )
-    valid_refresh_tokens = await get_valid_tokens(redis_client, user.id, TokenType.REFRESH)
-    if valid_refresh_tokens:
-        await add_token_to_redis(
-            redis_client,
-            user,
-            refresh_token,
-            TokenType.REFRESH,
-            settings.srv.REFRESH_TOKEN_EXPIRE_MINUTES,
-        )
+    await add_tokens_if_tracked(
+        redis_client,
+        user.id,
+        TokenGrant.from_token(TokenType.ACCESS, access_token),
+        TokenGrant.from_token(TokenType.REFRESH, refresh_token),
+    )
 
     logger.info(f"User '{user.email}' successful loggined")
 
-    # return create_response(meta=meta_data, data=data, message="Login correctly")
     return create_response(data=data, message="Login correctly")
 
 
@@ -118,7 +113,7 @@ async def register(
         is_superuser=False,
     )
 
-    role = await repository.role.get_role_by_name(name="user")
+    role = await repository.role.get_cached_by_name(name="user")
     if not role:
         new_user.role_id = None
     else:
@@ -158,15 +153,11 @@ async def login_access_token(
 
     access_token_expires = timedelta(minutes=settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(user.id, expires_delta=access_token_expires)
-    valid_access_tokens = await get_valid_tokens(redis_client, user.id, TokenType.ACCESS)
-    if valid_access_tokens:
-        await add_token_to_redis(
-            redis_client,
-            user,
-            access_token,
-            TokenType.ACCESS,
-            settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES,
-        )
+    await add_tokens_if_tracked(
+        redis_client,
+        user.id,
+        TokenGrant.from_token(TokenType.ACCESS, access_token),
+    )
 
     return TokenRead(access_token=access_token, token_type="bearer")
 
@@ -209,26 +200,23 @@ async def get_new_access_token(
 
     if payload["type"] == "refresh":
         user_id = payload["sub"]
-        valid_refresh_tokens = await get_valid_tokens(redis_client, user_id, TokenType.REFRESH)
-        if valid_refresh_tokens and body.refresh_token not in valid_refresh_tokens:
-            raise HTTPException(status_code=403, detail="Refresh token invalid")
-
         access_token_expires = timedelta(minutes=settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES)
-        user = await repository.user.get(id=user_id)
+        user = await repository.user.get(id=user_id, profile="bare")
         if user.is_active:
             access_token = security.create_access_token(
                 user.id,
                 expires_delta=access_token_expires,
             )
-            valid_access_tokens = await get_valid_tokens(redis_client, user.id, TokenType.ACCESS)
-            if valid_access_tokens:
-                await add_token_to_redis(
-                    redis_client,
-                    user,
-                    access_token,
-                    TokenType.ACCESS,
-                    settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES,
-                )
+            # Checks the refresh token and tracks the access token in one round trip
+            is_valid = await validate_token(
+                redis_client,
+                user_id,
+                TokenType.REFRESH,
+                get_token_id(body.refresh_token, payload),
+                TokenGrant.from_token(TokenType.ACCESS, access_token),
+            )
+            if not is_valid:
+                raise HTTPException(status_code=403, detail="Refresh token invalid")
             return create_response(
                 data=TokenRead(access_token=access_token, token_type="bearer"),
                 message="Access token generated correctly",
@@ -256,22 +244,15 @@ async def change_password(
     Raises:
       - `HTTPException`: If the current password is invalid or if the new password is the same as the current password.
     """
-    if not verify_password(password.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(password.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid Current Password")
 
-    if verify_password(password.new_password, current_user.hashed_password):
+    if await password_hasher.verify(password.new_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="New Password should be different that the current one",
         )
 
-    # Update the user's password in the database
-    new_hashed_password = get_password_hash(password.new_password)
-    await repository.user.update(
-        obj_current=current_user,
-        obj_new={"hashed_password": new_hashed_password},
-    )
-
     # Create new access and refresh tokens
     access_token_expires = timedelta(minutes=settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token_expires = timedelta(minutes=settings.srv.REFRESH_TOKEN_EXPIRE_MINUTES)
@@ -283,6 +264,24 @@ async def change_password(
         current_user.id,
         expires_delta=refresh_token_expires,
     )
+
+    # Replace any existing access and refresh tokens of the user with the new ones
+    await replace_tokens(
+        redis_client,
+        current_user.id,
+        TokenGrant.from_token(TokenType.ACCESS, access_token),
+        TokenGrant.from_token(TokenType.REFRESH, refresh_token),
+    )
+
+    # Update the user's password in the database, it drops the cached principal once the old
+    # tokens can not cache it again
+    new_hashed_password = await password_hasher.hash(password.new_password)
+    await repository.user.update(
+        obj_current=current_user,
+        obj_new={"hashed_password": new_hashed_password},
+    )
+
+    await repository.image.load_renditions(images=[current_user.image])
     data = Token(
         access_token=access_token,
         token_type="bearer",
@@ -290,26 +289,6 @@ async def change_password(
         user=current_user,
     )
 
-    # Delete any existing access and refresh tokens for the user
-    await delete_tokens(redis_client, current_user, TokenType.ACCESS)
-    await delete_tokens(redis_client, current_user, TokenType.REFRESH)
-
-    # Add the new access and refresh tokens to Redis
-    await add_token_to_redis(
-        redis_client,
-        current_user,
-        access_token,
-        TokenType.ACCESS,
-        settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES,
-    )
-    await add_token_to_redis(
-        redis_client,
-        current_user,
-        refresh_token,
-        TokenType.REFRESH,
-        settings.srv.REFRESH_TOKEN_EXPIRE_MINUTES,
-    )
-
     logger.info(f"User '{current_user.email}' changed password")
 
     return create_response(data=data, message="New password generated")
@@ -332,21 +311,15 @@ async def forgot_password(
       - `HTTPException`: If the provided email address is not associated with an existing user.
     """
     email = body.email
-    user = await repository.user.get_by_email(email=email)
+    user = await repository.user.get_by_email(email=email, profile="bare")
     if not user:
         raise EmailNotFoundException(email=email)
 
     otp_code = security.create_otp_code(length=6)
-    await delete_otps(redis_client, user)
-    await add_otp_to_redis(
-        redis_client,
-        user,
-        otp_code,
-        settings.srv.OTP_EXPIRE_MINUTES,
-    )
+    await replace_otp(redis_client, user.id, otp_code, settings.srv.OTP_EXPIRE_MINUTES)
 
-    # Send the verification email containing the OTP code
-    send_verification_email.delay(email_to=email, otp_code=otp_code)
+    # Queue the verification email containing the OTP code, it is sent with others in a batch
+    await enqueue_verification_email(redis_client, email_to=email, otp_code=otp_code)
 
     return create_response(data={}, message="OTP code sent to e-mail")
 
@@ -368,13 +341,17 @@ async def send_otp_code(
       - `HTTPException`: If the user entered an invalid otp code.
     """
     email = body.email
-    user = await repository.user.get_by_email(email=email)
+    user = await repository.user.get_by_email(email=email, profile="bare")
     if not user:
         raise EmailNotFoundException(email=email)
 
-    otp_set = await get_valid_otp(redis_client, user.id)
+    # Create new reset token, it only becomes valid if the code is redeemed
+    reset_token_expires = timedelta(minutes=settings.srv.RESET_TOKEN_EXPITE_MINUTES)
+    reset_token = security.create_reset_token(user.id, expires_delta=reset_token_expires)
 
-    if body.otp not in otp_set:
+    # Consume the code and replace any existing reset tokens of the user with the new one
+    reset_grant = TokenGrant.from_token(TokenType.RESET, reset_token)
+    if not await redeem_otp(redis_client, user.id, body.otp, reset_grant):
         logger.warning(f"The user '{email}' entered an invalid otp code")
         raise HTTPException(
             status_code=400,
@@ -384,22 +361,6 @@ async def send_otp_code(
     else:
         logger.info(f"The user '{email}' has successfully entered the OTP code")
 
-        # Create new reset token
-        reset_token_expires = timedelta(minutes=settings.srv.RESET_TOKEN_EXPITE_MINUTES)
-        reset_token = security.create_reset_token(user.id, expires_delta=reset_token_expires)
-
-        # Delete any existing reset tokens for the user
-        await delete_tokens(redis_client, user, TokenType.RESET)
-
-        # Add the new reset token to Redis
-        await add_token_to_redis(
-            redis_client,
-            user,
-            reset_token,
-            TokenType.RESET,
-            settings.srv.RESET_TOKEN_EXPITE_MINUTES,
-        )
-
         data = ResetToken(reset_token=reset_token)
 
         return create_response(data=data, message="The OTP code is correct")
@@ -444,22 +405,38 @@ async def reset_password(
     if payload["type"] == "reset":
         user_id = payload["sub"]
 
-        # Get the valid reset tokens from Redis
-        valid_reset_tokens = await get_valid_tokens(redis_client, user_id, TokenType.RESET)
-
-        if not valid_reset_tokens or body.reset_token not in valid_reset_tokens:
+        # The reset token must have been issued by the otp endpoint
+        is_valid = await validate_token(
+            redis_client,
+            user_id,
+            TokenType.RESET,
+            get_token_id(body.reset_token, payload),
+            required=True,
+        )
+        if not is_valid:
             raise HTTPException(status_code=403, detail="Reset token invalid")
 
-        user = await repository.user.get(id=user_id)
+        user = await repository.user.get(id=user_id, profile="bare")
 
         if user.is_active:
+            # Sign out every session and consume the reset token before the update drops the
+            # cached principal
+            await revoke_tokens(
+                redis_client,
+                user.id,
+                TokenType.ACCESS,
+                TokenType.REFRESH,
+                TokenType.RESET,
+            )
+
             # Set the user's new password in the database
-            hashed_password = get_password_hash(body.password)
+            hashed_password = await password_hasher.hash(body.password)
             await repository.user.update(
                 obj_current=user,
                 obj_new={"hashed_password": hashed_password},
             )
             logger.info(f"User '{user.email}' set new password successfully")
+            await repository.image.load_renditions(images=[user.image])
 
             return create_response(data=user, message="New password was set successfully")
         else:
@@ -3,10 +3,12 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, status
 from fastapi_pagination import Params
 from loguru import logger
+from redis.asyncio import Redis
 
 from app import repository
 from app.api import deps
-from app.models import Project, User
+from app.deps import project_deps
+from app.models import Project, ProjectUserLink, Task, User
 from app.schemas.project_schema import (
     IProjectCreate,
     IProjectRead,
@@ -15,8 +17,10 @@ from app.schemas.project_schema import (
     IProjectWithUsersTasks,
 )
 from app.schemas.response_schema import (
+    CursorParams,
     IDeleteResponseBase,
     IGetResponseBase,
+    IGetResponseCursorPaginated,
     IGetResponsePaginated,
     IPostResponseBase,
     create_response,
@@ -24,17 +28,24 @@ from app.schemas.response_schema import (
 from app.schemas.statistics_schema import StatisticsRead
 from app.schemas.task_schema import ITaskRead
 from app.schemas.user_schema import IUserRead
-from app.utils.exceptions import (
-    IdNotFoundException,
-    UserNotCreatorProject,
-    UserNotMemberProject,
+from app.utils.exceptions import IdNotFoundException, UserNotCreatorProject
+from app.utils.project_stats import (
+    add_project_to_stats,
+    get_or_load_stats,
+    remove_project_from_stats,
 )
-from app.utils.exceptions.project_exception import UserAlredyMemberProject
+from app.utils.response_cache import cached
 
 router = APIRouter()
 
 
 @router.get("/me")
+@cached(
+    Project.__tablename__,
+    ProjectUserLink.__tablename__,
+    User.__tablename__,
+    per_user=True,
+)
 async def get_my_projects(
     params: Params = Depends(),
     current_user: User = Depends(deps.get_current_user()),
@@ -51,7 +62,24 @@ async def read_project_list(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponsePaginated[IProjectWithUsers]:
     """Endpoint for getting a list of projects."""
-    projects = await repository.project.get_multi_paginated(params=params)
+    projects = await repository.project.get_multi_paginated(
+        params=params,
+        profile="with_members",
+    )
+
+    return create_response(data=projects)
+
+
+@router.get("/list/cursor")
+async def read_project_list_by_cursor(
+    params: CursorParams = Depends(),
+    current_user: User = Depends(deps.get_current_user()),
+) -> IGetResponseCursorPaginated[IProjectWithUsers]:
+    """Endpoint for getting a list of projects using cursor pagination."""
+    projects = await repository.project.get_multi_cursor_paginated(
+        params=params,
+        profile="with_members",
+    )
 
     return create_response(data=projects)
 
@@ -59,9 +87,10 @@ async def read_project_list(
 @router.get("/stats")
 async def get_project_statistics(
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IGetResponseBase[StatisticsRead]:
     """Endpoint for getting a statistics of projects."""
-    stats = await repository.project.get_stats()
+    stats = await get_or_load_stats(redis_client, repository.project.get_stats)
 
     return create_response(data=stats)
 
@@ -70,21 +99,29 @@ async def get_project_statistics(
 async def create_project(
     new_project: IProjectCreate,
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IPostResponseBase[IProjectRead]:
     """Creates a new project."""
     project = await repository.project.create(obj_in=new_project, user=current_user)
+    await add_project_to_stats(redis_client, project.percent_completed)
     logger.info(f"User '{current_user.id}' created new project: '{project.id}'")
 
     return create_response(data=project)
 
 
 @router.get("/{project_id}")
+@cached(
+    Project.__tablename__,
+    ProjectUserLink.__tablename__,
+    User.__tablename__,
+    Task.__tablename__,
+)
 async def get_project_by_id(
     project_id: UUID,
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponseBase[IProjectWithUsersTasks]:
     """Gets a project by id."""
-    if project := await repository.project.get(id=project_id):
+    if project := await repository.project.get(id=project_id, profile="full"):
         return create_response(data=project)
     else:
         raise IdNotFoundException(Project, id=project_id)
@@ -97,13 +134,13 @@ async def update_project_by_id(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IPostResponseBase[IProjectRead]:
     """Update a project by id."""
-    current_project = await repository.project.get(id=project_id)
+    await project_deps.is_project_member(current_user.id, project_id)
+
+    current_project = await repository.project.get(id=project_id, profile="bare")
     if not current_project:
         raise IdNotFoundException(Project, id=project_id)
 
-    if current_user not in current_project.users:
-        raise UserNotMemberProject()
-
+    # The completion only changes with the tasks, the stats are not affected
     project_updated = await repository.project.update(obj_new=project, obj_current=current_project)
     logger.info(f"User '{current_user.id}' updated project: '{project_id}'")
 
@@ -114,19 +151,21 @@ async def update_project_by_id(
 async def remove_project_by_id(
     project_id: UUID,
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IDeleteResponseBase[IProjectRead]:
     """Delete a project by id."""
-    project = await repository.project.get(id=project_id)
+    project = await repository.project.get(id=project_id, profile="bare")
     if not project:
         raise IdNotFoundException(Project, id=project_id)
 
     if not project.created_by_id == current_user.id:
         raise UserNotCreatorProject()
 
-    project = await repository.project.remove(id=project_id)
+    project, deleted = await repository.project.remove_cascade(id=project_id)
+    await remove_project_from_stats(redis_client, project.percent_completed)
     logger.info(f"User '{current_user.id}' deleted project: '{project_id}'")
 
-    return create_response(data=project)
+    return create_response(data=project, meta={"deleted": deleted})
 
 
 @router.get("/{project_id}/join")
@@ -135,14 +174,15 @@ async def join_to_project_by_id(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponseBase[IProjectWithUsers]:
     """Endpoint for a user to join a project."""
-    current_project = await repository.project.get(id=project_id)
+    await project_deps.is_not_project_member(current_user.id, project_id)
+
+    current_project = await repository.project.get(id=project_id, profile="with_members")
     if not current_project:
         raise IdNotFoundException(Project, id=project_id)
 
-    if current_user in current_project.users:
-        raise UserAlredyMemberProject()
-
     project = await repository.project.join_the_project(user=current_user, project=current_project)
+    # The other members were loaded with their renditions by the profile
+    await repository.image.load_renditions(images=[current_user.image])
     logger.info(f"User '{current_user.id}' join a project: '{project_id}'")
 
     return create_response(data=project)
@@ -154,13 +194,12 @@ async def leave_to_project_by_id(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponseBase[IProjectWithUsers]:
     """Endpoint for a user to leave a project."""
-    current_project = await repository.project.get(id=project_id)
+    await project_deps.is_project_member(current_user.id, project_id)
+
+    current_project = await repository.project.get(id=project_id, profile="with_members")
     if not current_project:
         raise IdNotFoundException(Project, id=project_id)
 
-    if current_user not in current_project.users:
-        raise UserNotMemberProject()
-
     project = await repository.project.leave_the_project(
         user=current_user,
         project=current_project,
@@ -176,9 +215,7 @@ async def tasks_list_by_project_id(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponsePaginated[ITaskRead]:
     """This endpoint allows getting a list of tasks associated with a project."""
-    current_project = await repository.project.get(id=project_id)
-    if not current_project:
-        raise IdNotFoundException(Project, id=project_id)
+    await project_deps.project_exists(current_user.id, project_id)
 
     tasks = await repository.project.get_tasks(project_id=project_id)
 
@@ -186,15 +223,14 @@ async def tasks_list_by_project_id(
 
 
 @router.get("/{project_id}/members")
+@cached(Project.__tablename__, ProjectUserLink.__tablename__, User.__tablename__)
 async def members_list_by_project_id(
     project_id: UUID,
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponsePaginated[IUserRead]:
     """This endpoint allows getting a list of members associated with a project."""
-    current_project = await repository.project.get(id=project_id)
-    if not current_project:
-        raise IdNotFoundException(Project, id=project_id)
+    await project_deps.project_exists(current_user.id, project_id)
 
-    projects = await repository.project.get_members(project=current_project)
+    members = await repository.project.get_members(project_id=project_id)
 
-    return create_response(data=projects)
+    return create_response(data=members)
@@ -18,6 +18,7 @@ from app.utils.exceptions import (
     ContentNoChangeException,
     NameExistException,
 )
+from app.utils.response_cache import cached
 
 router = APIRouter()
 
@@ -32,7 +33,7 @@ async def create_role(
     Required roles:
       - admin
     """
-    role_current = await repository.role.get_role_by_name(name=role.name)
+    role_current = await repository.role.get_cached_by_name(name=role.name)
     if role_current:
         raise NameExistException(Role, name=role_current.name)
 
@@ -41,17 +42,19 @@ async def create_role(
 
 
 @router.get("/list")
+@cached(Role.__tablename__)
 async def get_roles_list(
     params: Params = Depends(),
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponsePaginated[IRoleRead]:
     """Gets a paginated list of roles."""
-    roles = await repository.role.get_multi_paginated(params=params)
+    roles = await repository.role.get_multi_paginated(params=params, profile="bare")
 
     return create_response(data=roles)
 
 
 @router.get("/{role_id}", status_code=status.HTTP_200_OK)
+@cached(Role.__tablename__)
 async def get_role_by_id(
     role: Role = Depends(role_deps.get_role_by_id),  # role_id
     current_user: User = Depends(deps.get_current_user()),
@@ -74,7 +77,7 @@ async def update_permission(
     if current_role.name == role.name and current_role.description == role.description:
         raise ContentNoChangeException()
 
-    exist_role = await repository.role.get_role_by_name(name=role.name)
+    exist_role = await repository.role.get_cached_by_name(name=role.name)
     if exist_role:
         raise NameExistException(Role, name=role.name)
 
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.db.session import get_pool_stats
+from app.models.user_model import User
+from app.schemas.response_schema import IGetResponseBase, create_response
+from app.schemas.role_schema import IRoleEnum
+from app.schemas.system_schema import IDatabasePoolStats, IPasswordHasherStats
+from app.utils.password_hasher import password_hasher
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_database_pool_stats(
+    current_user: User = Depends(deps.get_current_user(required_roles=[IRoleEnum.admin])),
+) -> IGetResponseBase[IDatabasePoolStats]:
+    """Gets the connection pool statistics of this worker process.
+
+    Required roles:
+      - admin
+    """
+    return create_response(data=IDatabasePoolStats(**get_pool_stats()))
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats(
+    current_user: User = Depends(deps.get_current_user(required_roles=[IRoleEnum.admin])),
+) -> IGetResponseBase[IPasswordHasherStats]:
+    """Gets the password hashing pool statistics of this worker process.
+
+    Required roles:
+      - admin
+    """
+    return create_response(data=IPasswordHasherStats(**password_hasher.get_stats()))
@@ -4,13 +4,17 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, status
 from fastapi_pagination import Params
 from loguru import logger
+from redis.asyncio import Redis
 
 from app import repository
 from app.api import deps
-from app.models import Project, Task, User
+from app.deps import project_deps
+from app.models import Task, User
 from app.schemas.response_schema import (
+    CursorParams,
     IDeleteResponseBase,
     IGetResponseBase,
+    IGetResponseCursorPaginated,
     IGetResponsePaginated,
     IPostResponseBase,
     create_response,
@@ -21,10 +25,8 @@ from app.schemas.task_schema import (
     ITaskUpdate,
     ITaskWithProjectName,
 )
-from app.utils.exceptions import (
-    IdNotFoundException,
-    UserNotMemberProject,
-)
+from app.utils.exceptions import IdNotFoundException
+from app.utils.project_stats import invalidate_stats_snapshot
 
 router = APIRouter()
 
@@ -39,7 +41,22 @@ async def get_my_tasks_list(
     Returns:
         A paginated response containing the tasks with the project name.
     """
-    tasks = await repository.task.get_by_user(user=current_user)
+    tasks = await repository.task.get_by_user(params=params, user=current_user)
+
+    return create_response(data=tasks)
+
+
+@router.get("/list/cursor")
+async def get_my_tasks_list_by_cursor(
+    params: CursorParams = Depends(),
+    current_user: User = Depends(deps.get_current_user()),
+) -> IGetResponseCursorPaginated[ITaskWithProjectName]:
+    """Endpoint to retrieve the tasks list of the current user using cursor pagination.
+
+    Returns:
+        A cursor paginated response containing the tasks with the project name.
+    """
+    tasks = await repository.task.get_by_user_cursor(params=params, user=current_user)
 
     return create_response(data=tasks)
 
@@ -54,7 +71,10 @@ async def get_my_not_completed_tasks_list(
     Returns:
         A paginated response containing the not completed tasks with the project name.
     """
-    tasks = await repository.task.get_not_completed_by_user(user=current_user)
+    tasks = await repository.task.get_not_completed_by_user(
+        params=params,
+        user=current_user,
+    )
 
     return create_response(data=tasks)
 
@@ -73,7 +93,11 @@ async def get_tasks_list_by_deadline(
     Returns:
         A paginated response containing the tasks with the project name.
     """
-    tasks = await repository.task.get_by_deadline(user=current_user, date=date)
+    tasks = await repository.task.get_by_deadline(
+        params=params,
+        user=current_user,
+        date=date,
+    )
 
     return create_response(data=tasks)
 
@@ -82,6 +106,7 @@ async def get_tasks_list_by_deadline(
 async def create_task(
     new_task: ITaskCreate,
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IPostResponseBase[ITaskRead]:
     """Endpoint to create a new task.
 
@@ -92,9 +117,12 @@ async def create_task(
         The created task data.
     """
     if new_task.project_id:
-        await check_user_member_project(user_id=current_user.id, project_id=new_task.project_id)
+        await project_deps.is_project_member(current_user.id, new_task.project_id)
 
     task = await repository.task.create(obj_in=new_task, user=current_user)
+    if task.project_id:
+        # The project completion is recalculated by a database trigger
+        await invalidate_stats_snapshot(redis_client)
     logger.info(f"User '{current_user.id}' created new task: '{task.id}'")
 
     return create_response(data=task)
@@ -113,7 +141,7 @@ async def get_task_by_id(
     Returns:
         The task data.
     """
-    if task := await repository.task.get(id=task_id):
+    if task := await repository.task.get(id=task_id, profile="bare"):
         return create_response(data=task)
     else:
         raise IdNotFoundException(Task, id=task_id)
@@ -124,6 +152,7 @@ async def update_task_by_id(
     task_id: UUID,
     task: ITaskUpdate,
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IPostResponseBase[ITaskRead]:
     """Endpoint to update a task by ID.
 
@@ -134,17 +163,17 @@ async def update_task_by_id(
     Returns:
         The updated task data.
     """
-    current_task = await repository.task.get(id=task_id)
+    current_task = await repository.task.get(id=task_id, profile="bare")
     if not current_task:
         raise IdNotFoundException(Task, id=task_id)
 
     if current_task.project_id:
-        await check_user_member_project(
-            user_id=current_user.id,
-            project_id=current_task.project_id,
-        )
+        await project_deps.is_project_member(current_user.id, current_task.project_id)
 
+    old_project_id = current_task.project_id
     task_updated = await repository.task.update(obj_new=task, obj_current=current_task)
+    if old_project_id or task_updated.project_id:
+        await invalidate_stats_snapshot(redis_client)
     logger.info(f"User '{current_user.id}' updated task: '{task_id}'")
 
     return create_response(data=task_updated)
@@ -154,6 +183,7 @@ async def update_task_by_id(
 async def remove_task_by_id(
     task_id: UUID,
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IDeleteResponseBase[ITaskRead]:
     """Endpoint to delete a task by ID.
 
@@ -163,24 +193,15 @@ async def remove_task_by_id(
     Returns:
         The deleted task data.
     """
-    current_task = await repository.task.get(id=task_id)
+    current_task = await repository.task.get(id=task_id, profile="bare")
     if not current_task:
         raise IdNotFoundException(Task, id=task_id)
 
-    await check_user_member_project(user_id=current_user.id, project_id=current_task.project_id)
+    await project_deps.is_project_member(current_user.id, current_task.project_id)
 
     task = await repository.task.remove(id=task_id)
+    if task.project_id:
+        await invalidate_stats_snapshot(redis_client)
     logger.info(f"User '{current_user.id}' deleted task: '{task_id}'")
 
     return create_response(data=task)
-
-
-async def check_user_member_project(user_id: str, project_id: str) -> None:
-    """Check whether the user is a member of the project."""
-    project = await repository.project.get(id=project_id)
-    if not project:
-        raise IdNotFoundException(Project, id=project_id)
-
-    is_member = await repository.project.is_member_project(user_id=user_id, project_id=project_id)
-    if not is_member:
-        raise UserNotMemberProject()
@@ -1,9 +1,17 @@
-import os
-from io import BytesIO
-
-from fastapi import APIRouter, Body, Depends, File, Query, Response, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
 from fastapi_pagination import Params
 from loguru import logger
+from redis.asyncio import Redis
 
 from app import repository
 from app.api import deps
@@ -11,13 +19,15 @@ from app.deps import user_deps
 from app.models import User
 from app.models.role_model import Role
 from app.schemas.common_schema import IOrderEnum
-from app.schemas.media_schema import IMediaCreate
 from app.schemas.response_schema import (
+    CursorParams,
     IDeleteResponseBase,
     IGetResponseBase,
+    IGetResponseCursorPaginated,
     IGetResponsePaginated,
     IPostResponseBase,
     IPutResponseBase,
+    create_json_response,
     create_response,
 )
 from app.schemas.role_schema import IRoleEnum
@@ -25,8 +35,8 @@ from app.schemas.user_schema import IUserCreate, IUserRead, IUserUpdate
 from app.tasks import generate_avatar_thumbnail
 from app.utils.exceptions import IdNotFoundException, UserSelfDeleteException
 from app.utils.minio_client import MinioClient
-from app.utils.resize_image import modify_image
-from app.utils.uuid6 import uuid7
+from app.utils.project_stats import invalidate_stats_snapshot
+from app.utils.upload import save_image_upload
 
 router = APIRouter()
 
@@ -36,6 +46,7 @@ async def get_my_data(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponseBase[IUserRead]:
     """Gets my user profile information."""
+    await repository.image.load_renditions(images=[current_user.image])
 
     return create_response(data=current_user)
 
@@ -52,6 +63,7 @@ async def update_my_data(
         await user_deps.username_exists(user=user)
 
     user_updated = await repository.user.update(obj_new=user, obj_current=current_user)
+    await repository.image.load_renditions(images=[user_updated.image])
     logger.info(f"User '{current_user.id}' updated profile information")
 
     return create_response(data=user_updated)
@@ -67,7 +79,7 @@ async def create_user(
     Required roles:
       - admin
     """
-    role = await repository.role.get(id=user.role_id)
+    role = await repository.role.get_cached(id=user.role_id)
     if not role:
         raise IdNotFoundException(Role, id=user.role_id)
 
@@ -76,18 +88,37 @@ async def create_user(
     return create_response(data=user)
 
 
-@router.get("/list")
+@router.get("/list", response_model=IGetResponsePaginated[IUserRead])
 async def read_users_list(
     params: Params = Depends(),
     current_user: User = Depends(deps.get_current_user()),
-) -> IGetResponsePaginated[IUserRead]:
+) -> Response:
     """Retrieve users. Requires admin or manager role."""
-    users = await repository.user.get_multi_paginated(params=params)
+    users = await repository.user.get_multi_paginated(params=params, schema=IUserRead)
+
+    return create_json_response(IGetResponsePaginated[IUserRead], data=users)
 
-    return create_response(data=users)
 
+@router.get("/list/cursor", response_model=IGetResponseCursorPaginated[IUserRead])
+async def read_users_list_by_cursor(
+    order: IOrderEnum | None = Query(
+        default=IOrderEnum.ascendent,
+        description="It is optional. Default is ascendent",
+    ),
+    params: CursorParams = Depends(),
+    current_user: User = Depends(deps.get_current_user()),
+) -> Response:
+    """Retrieve users ordered by created datetime using cursor pagination."""
+    users = await repository.user.get_multi_cursor_paginated(
+        params=params,
+        order=order,
+        schema=IUserRead,
+    )
 
-@router.get("/list/by_created_at")
+    return create_json_response(IGetResponseCursorPaginated[IUserRead], data=users)
+
+
+@router.get("/list/by_created_at", response_model=IGetResponsePaginated[IUserRead])
 async def get_user_list_order_by_created_at(
     order: IOrderEnum | None = Query(
         default=IOrderEnum.ascendent,
@@ -95,15 +126,16 @@ async def get_user_list_order_by_created_at(
     ),
     params: Params = Depends(),
     current_user: User = Depends(deps.get_current_user()),
-) -> IGetResponsePaginated[IUserRead]:
+) -> Response:
     """Gets a paginated list of users ordered by created datetime."""
     users = await repository.user.get_multi_paginated_ordered(
         params=params,
         order=order,
         order_by="created_at",
+        schema=IUserRead,
     )
 
-    return create_response(data=users)
+    return create_json_response(IGetResponsePaginated[IUserRead], data=users)
 
 
 @router.get("/{user_id}")
@@ -113,6 +145,8 @@ async def get_user_by_id(
 ) -> IGetResponseBase[IUserRead]:
     """
     Gets a user by his/her id."""
+    await repository.image.load_renditions(images=[user.image])
+
     return create_response(data=user)
 
 
@@ -133,6 +167,7 @@ async def update_user_by_id(
         await user_deps.username_exists(user=user)
 
     user_updated = await repository.user.update(obj_new=user, obj_current=updated_user)
+    await repository.image.load_renditions(images=[user_updated.image])
 
     return create_response(data=user_updated)
 
@@ -140,13 +175,22 @@ async def update_user_by_id(
 @router.delete("/me")
 async def delete_my_account(
     current_user: User = Depends(deps.get_current_user()),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IDeleteResponseBase[IUserRead]:
     """Delete my own account."""
     try:
-        user = await repository.user.remove(id=current_user.id)
+        user, deleted = await repository.user.remove_cascade(id=current_user.id)
+        if deleted.tasks:
+            # Their projects, possibly of other members, changed completion
+            await invalidate_stats_snapshot(redis_client)
+        await repository.image.load_renditions(images=[user.image])
         logger.info(f"User '{current_user.id}' deleted their own account")
 
-        return create_response(data=user, message="Your account has been deleted.")
+        return create_response(
+            data=user,
+            message="Your account has been deleted.",
+            meta={"deleted": deleted},
+        )
     except Exception as e:
         logger.error(f"Error deleting user '{current_user.id}': {e}")
         return Response("Internal server error", status_code=500)
@@ -156,6 +200,7 @@ async def delete_my_account(
 async def remove_user_by_id(
     user: User = Depends(user_deps.is_valid_user),
     current_user: User = Depends(deps.get_current_user(required_roles=[IRoleEnum.admin])),
+    redis_client: Redis = Depends(deps.get_redis_client),
 ) -> IDeleteResponseBase[IUserRead]:
     """Delete a user by his/her id.
 
@@ -165,9 +210,12 @@ async def remove_user_by_id(
     if current_user.id == user.id:
         raise UserSelfDeleteException()
 
-    user = await repository.user.remove(id=user.id)
+    user, deleted = await repository.user.remove_cascade(id=user.id)
+    if deleted.tasks:
+        await invalidate_stats_snapshot(redis_client)
+    await repository.image.load_renditions(images=[user.image])
 
-    return create_response(data=user, message="User removed")
+    return create_response(data=user, message="User removed", meta={"deleted": deleted})
 
 
 @router.post("/image")
@@ -180,33 +228,21 @@ async def upload_my_image(
 ) -> IPostResponseBase[IUserRead]:
     """Uploads a user image."""
     try:
-        image_bytes = BytesIO(image_file.file.read())
-        image_modified = modify_image(image_bytes)
-
-        file_name_split = os.path.splitext(image_file.filename)
-        file_name = f"{uuid7()}{file_name_split[-1]}"
-
-        data_file = minio_client.put_object(
-            file_name=file_name,
-            file_data=BytesIO(image_modified.file_data),
-            content_type=image_file.content_type,
-        )
+        image, created = await save_image_upload(minio_client, image_file, title, description)
 
         # Add to Database
-        media = IMediaCreate(title=title, description=description, path=data_file.file_name)
-        user = await repository.user.update_photo(
-            user=current_user,
-            image=media,
-            heigth=image_modified.height,
-            width=image_modified.width,
-            file_format=image_modified.file_format,
-        )
+        user = await repository.user.update_photo(user=current_user, image=image)
+        await repository.image.load_renditions(images=[user.image])
         logger.info(f"User '{current_user.id}' updated profile image")
 
-        generate_avatar_thumbnail.delay(current_user.id, data_file.file_name)
+        # Copies of an identical image share its renditions
+        if created:
+            generate_avatar_thumbnail.delay(current_user.id, image.media.path)
 
         return create_response(data=user)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(e)
         return Response("Internal server error", status_code=500)
@@ -227,23 +263,14 @@ async def upload_user_image(
       - admin
     """
     try:
-        image_modified = modify_image(BytesIO(image_file.file.read()))
-        data_file = minio_client.put_object(
-            file_name=image_file.filename,
-            file_data=BytesIO(image_modified.file_data),
-            content_type=image_file.content_type,
-        )
-        media = IMediaCreate(title=title, description=description, path=data_file.file_name)
-        user = await repository.user.update_photo(
-            user=user,
-            image=media,
-            heigth=image_modified.height,
-            width=image_modified.width,
-            file_format=image_modified.file_format,
-        )
+        image, _ = await save_image_upload(minio_client, image_file, title, description)
+        user = await repository.user.update_photo(user=user, image=image)
+        await repository.image.load_renditions(images=[user.image])
 
         return create_response(data=user)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(e)
         return Response("Internal server error", status_code=500)
@@ -36,6 +36,25 @@ class SrvSettings(BaseSettings):
     OTP_EXPIRE_MINUTES: int = 5  # 5 minutes
     RESET_TOKEN_EXPITE_MINUTES: int = 30  # 30 minutes
 
+    # Threads running bcrypt in every API worker, calls beyond the pending limit answer 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # --------------------------------------------------
+    # > Caches
+    # --------------------------------------------------
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # 0 disables the cache
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 5  # 0 disables the cache
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 4096
+    PROJECT_STATS_SNAPSHOT_TTL_SECONDS: int = 300  # 0 disables the snapshot
+    # Upper bound of a cached response, writes invalidate them through their tags before
+    RESPONSE_CACHE_EXPIRE_SECONDS: int = 60
+    # Roles are cached by every process in front of Redis, changes are broadcast to all of them
+    ROLE_CACHE_TTL_SECONDS: int = 60  # 0 disables the local cache
+    ROLE_CACHE_MAX_SIZE: int = 256
+    ROLE_CACHE_REDIS_TTL_SECONDS: int = 86400
+
     # --------------------------------------------------
     # > Misc
     # --------------------------------------------------
@@ -81,13 +100,25 @@ class DatabaseSettings(BaseSettings):
                 )
         return v
 
+    # Pool of every API worker process, Postgres must allow
+    # WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections for the API alone
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+
     # --------------------------------------------------
     # > Redis
     # --------------------------------------------------
     REDIS_HOST: str
     REDIS_PORT: str
     REDIS_PASSWORD: str
-    REDIS_POOL_SIZE: str
+    REDIS_POOL_SIZE: int
+    REDIS_CACHE_POOL_SIZE: int = 10
+    REDIS_POOL_TIMEOUT: int = 5  # seconds to wait for a free connection
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
 
 
 class FileStorageSettings(BaseSettings):
@@ -98,6 +129,40 @@ class FileStorageSettings(BaseSettings):
     MINIO_ROOT_PASSWORD: str
     MINIO_URL: str
     MINIO_BUCKET: str
+    MINIO_URL_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days, the maximum of a presigned URL
+    MINIO_URL_CACHE_TTL_SECONDS: int = 60 * 60 * 24  # 1 day, 0 disables the cache
+    MINIO_URL_CACHE_MAX_SIZE: int = 10000
+
+    # --------------------------------------------------
+    # > Uploads
+    # --------------------------------------------------
+    UPLOAD_MAX_SIZE_BYTES: int = 25 * 1024 * 1024  # 25 MB
+    UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024  # 1 MB
+    # Uploads processed at once by every API worker, the others wait in line
+    UPLOAD_MAX_CONCURRENCY: int = 4
+    UPLOAD_QUEUE_TIMEOUT_SECONDS: int = 10  # waiting longer answers 503
+    UPLOAD_WORKERS: int = 2  # threads decoding images and talking to MinIO
+    # Re-encode uploads without metadata and clamped to UPLOAD_MAX_IMAGE_DIMENSION pixels,
+    # otherwise only the image header is read and the original bytes are stored
+    UPLOAD_SANITIZE_IMAGES: bool = False
+    UPLOAD_MAX_IMAGE_DIMENSION: int = 4096
+
+    # --------------------------------------------------
+    # > Image renditions
+    # --------------------------------------------------
+    IMAGE_RENDITION_SIZES: list[int] = [64, 128, 256, 512]
+    # Every size is also stored in the format of the original image
+    IMAGE_RENDITION_FORMATS: list[str] = ["WEBP"]
+    IMAGE_RENDITION_QUALITY: int = 85
+    IMAGE_RENDITION_UPLOAD_WORKERS: int = 4
+
+    @field_validator("MINIO_URL_CACHE_TTL_SECONDS", mode="after")
+    @classmethod
+    def check_url_cache_ttl(cls, v: int, info: FieldValidationInfo) -> int:
+        # A cached URL must keep most of its validity when it is handed out
+        if v * 2 > info.data["MINIO_URL_EXPIRE_MINUTES"] * 60:
+            raise ValueError("MINIO_URL_CACHE_TTL_SECONDS must be below half the URL expiry")
+        return v
 
 
 class CelerySettings(BaseSettings):
@@ -109,11 +174,32 @@ class CelerySettings(BaseSettings):
 
     WS_MESSAGE_QUEUE: str
 
+    # Run by celery beat, the triggers on Task keep the counters exact otherwise
+    PROJECT_COUNTERS_RECONCILE_INTERVAL_SECONDS: int = 3600  # 0 disables the schedule
+
 
 class MailClientConfig(BaseSettings):
     MAIL_HOST: str | None
     MAIL_PORT: str | None
 
+    # Channels kept open by every worker process, calls are spread over them
+    MAIL_CHANNEL_POOL_SIZE: int = 2
+    # Pings during calls, the default server policy answers pings more frequent than every
+    # 5 minutes or without calls with GOAWAY too_many_pings
+    MAIL_KEEPALIVE_TIME_SECONDS: int = 300
+    MAIL_KEEPALIVE_TIMEOUT_SECONDS: int = 10
+    MAIL_RPC_TIMEOUT_SECONDS: float = 5.0  # deadline of a call, retries included
+    # Attempts of a call while the mail service is UNAVAILABLE, done by the channel
+    MAIL_RPC_MAX_ATTEMPTS: int = 4
+    # Retries of the task once the call failed, with exponential backoff
+    MAIL_TASK_MAX_RETRIES: int = 5
+    MAIL_TASK_RETRY_BACKOFF_MAX_SECONDS: int = 300
+    # OTP emails wait this long in Redis to be sent with the others in one call
+    MAIL_BATCH_WINDOW_SECONDS: float = 0.05
+    MAIL_BATCH_MAX_SIZE: int = 100  # a full batch is sent without waiting
+    # Beat flushes the emails left in Redis when their scheduled flush was lost, 0 disables
+    MAIL_BATCH_SWEEP_INTERVAL_SECONDS: int = 30
+
     model_config = SettingsConfigDict(case_sensitive=True)
 
 
@@ -1,6 +1,7 @@
 import random
 from datetime import datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
 import bcrypt
 import jwt
@@ -13,7 +14,7 @@ def create_access_token(subject: str | Any, expires_delta: timedelta = None) ->
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "access", "jti": uuid4().hex}
 
     return jwt.encode(
         payload=to_encode,
@@ -27,7 +28,7 @@ def create_refresh_token(subject: str | Any, expires_delta: timedelta = None) ->
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.srv.REFRESH_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh", "jti": uuid4().hex}
 
     return jwt.encode(
         payload=to_encode,
@@ -41,7 +42,7 @@ def create_reset_token(subject: str | Any, expires_delta: timedelta = None) -> s
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.srv.RESET_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "reset"}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "reset", "jti": uuid4().hex}
 
     return jwt.encode(
         payload=to_encode,
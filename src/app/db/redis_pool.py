@@ -0,0 +1,71 @@
+from redis import Redis as SyncRedis
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from app.core.config import settings
+
+redis_pool: BlockingConnectionPool | None = None
+# fastapi-cache stores encoded bytes, so it needs connections without response decoding
+cache_redis_pool: BlockingConnectionPool | None = None
+# Celery tasks are synchronous, their client reconnects by itself after a fork
+worker_redis_client: SyncRedis | None = None
+
+
+def create_redis_pool(max_connections: int, decode_responses: bool) -> BlockingConnectionPool:
+    return BlockingConnectionPool.from_url(
+        f"redis://{settings.database.REDIS_HOST}:{settings.database.REDIS_PORT}",
+        password=settings.database.REDIS_PASSWORD,
+        max_connections=max_connections,
+        timeout=settings.database.REDIS_POOL_TIMEOUT,
+        health_check_interval=settings.database.REDIS_HEALTH_CHECK_INTERVAL,
+        socket_keepalive=True,
+        encoding="utf8",
+        decode_responses=decode_responses,
+    )
+
+
+def get_redis_pool() -> BlockingConnectionPool:
+    """Returns the worker-wide pool, creating it on first use outside of the app lifespan."""
+    global redis_pool
+    if redis_pool is None:
+        redis_pool = create_redis_pool(settings.database.REDIS_POOL_SIZE, decode_responses=True)
+    return redis_pool
+
+
+def get_cache_redis_pool() -> BlockingConnectionPool:
+    global cache_redis_pool
+    if cache_redis_pool is None:
+        cache_redis_pool = create_redis_pool(
+            settings.database.REDIS_CACHE_POOL_SIZE,
+            decode_responses=False,
+        )
+    return cache_redis_pool
+
+
+async def init_redis_pools() -> None:
+    """Creates the pools and fails fast if Redis is unreachable."""
+    await Redis(connection_pool=get_redis_pool()).ping()
+    await Redis(connection_pool=get_cache_redis_pool()).ping()
+
+
+async def close_redis_pools() -> None:
+    global redis_pool, cache_redis_pool
+    for pool in (redis_pool, cache_redis_pool):
+        if pool is not None:
+            await pool.disconnect()
+    redis_pool = None
+    cache_redis_pool = None
+
+
+def get_worker_redis_client() -> SyncRedis:
+    """Returns the blocking client of a Celery worker process."""
+    global worker_redis_client
+    if worker_redis_client is None:
+        worker_redis_client = SyncRedis.from_url(
+            f"redis://{settings.database.REDIS_HOST}:{settings.database.REDIS_PORT}",
+            password=settings.database.REDIS_PASSWORD,
+            health_check_interval=settings.database.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_keepalive=True,
+            encoding="utf8",
+            decode_responses=True,
+        )
+    return worker_redis_client
@@ -1,25 +1,71 @@
 from collections.abc import AsyncGenerator
+from enum import Enum
+from time import perf_counter
+from typing import Any
 
 from sqlalchemy import MetaData
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 
-DB_POOL_SIZE = 83
-WEB_CONCURRENCY = 9
-POOL_SIZE = max(DB_POOL_SIZE // WEB_CONCURRENCY, 5)
-
 metadata = MetaData()
 
-engine = create_async_engine(
-    settings.database.ASYNC_DATABASE_URI,
-    echo=True,
-    future=True,
-    pool_size=POOL_SIZE,
-    max_overflow=64,
-)
+
+class EngineRole(str, Enum):
+    api = "api"
+    worker = "worker"
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self) -> Any:
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            self.wait_count += 1
+            self.wait_time_total += elapsed
+            self.wait_time_max = max(self.wait_time_max, elapsed)
+
+
+def create_db_engine(role: EngineRole = EngineRole.api) -> AsyncEngine:
+    engine_args: dict[str, Any] = {
+        "echo": settings.database.DB_ECHO,
+        "pool_pre_ping": settings.database.DB_POOL_PRE_PING,
+    }
+    if role == EngineRole.worker:
+        # Celery tasks run every coroutine in a new event loop (asyncer.runnify) and
+        # asyncpg connections can not outlive their loop, so workers must not pool.
+        engine_args["poolclass"] = NullPool
+    else:
+        engine_args.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.database.DB_POOL_SIZE,
+            max_overflow=settings.database.DB_MAX_OVERFLOW,
+            pool_timeout=settings.database.DB_POOL_TIMEOUT,
+            pool_recycle=settings.database.DB_POOL_RECYCLE,
+        )
+
+    return create_async_engine(settings.database.ASYNC_DATABASE_URI, **engine_args)
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -30,6 +76,34 @@ SessionLocal = sessionmaker(
 )
 
 
+def configure_engine(role: EngineRole) -> None:
+    """Rebuilds the engine for the given role, e.g. in a forked Celery worker process."""
+    global engine
+
+    # Connections inherited from the parent process must not be closed by the child
+    engine.sync_engine.dispose(close=False)
+    engine = create_db_engine(role)
+    SessionLocal.configure(bind=engine)
+
+
+def get_pool_stats() -> dict[str, Any]:
+    pool = engine.pool
+    stats: dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=settings.database.DB_MAX_OVERFLOW,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            wait_count=pool.wait_count,
+            wait_time_total=pool.wait_time_total,
+            wait_time_max=pool.wait_time_max,
+            timeouts=pool.timeouts,
+        )
+    return stats
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
@@ -0,0 +1,44 @@
+from uuid import UUID
+
+from app import repository
+from app.models.project_model import Project
+from app.utils.exceptions import (
+    IdNotFoundException,
+    UserAlredyMemberProject,
+    UserNotMemberProject,
+)
+from app.utils.membership_cache import cache_membership, get_cached_membership
+
+
+async def get_project_membership(user_id: UUID | str, project_id: UUID | str) -> tuple[bool, bool]:
+    """Returns whether the project exists and whether the user is a member of it."""
+    membership = get_cached_membership(user_id, project_id)
+    if membership is None:
+        membership = await repository.project.get_membership(
+            user_id=user_id,
+            project_id=project_id,
+        )
+        cache_membership(user_id, project_id, membership)
+    return membership
+
+
+async def project_exists(user_id: UUID | str, project_id: UUID | str) -> None:
+    exists, _ = await get_project_membership(user_id, project_id)
+    if not exists:
+        raise IdNotFoundException(Project, id=project_id)
+
+
+async def is_project_member(user_id: UUID | str, project_id: UUID | str) -> None:
+    exists, is_member = await get_project_membership(user_id, project_id)
+    if not exists:
+        raise IdNotFoundException(Project, id=project_id)
+    if not is_member:
+        raise UserNotMemberProject()
+
+
+async def is_not_project_member(user_id: UUID | str, project_id: UUID | str) -> None:
+    exists, is_member = await get_project_membership(user_id, project_id)
+    if not exists:
+        raise IdNotFoundException(Project, id=project_id)
+    if is_member:
+        raise UserAlredyMemberProject()
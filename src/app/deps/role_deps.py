@@ -14,14 +14,14 @@ from app.utils.exceptions.common_exception import (
 async def get_role_by_name(
     role_name: Annotated[str, Query(title="String compare with name or last name")] = "",
 ) -> Role:
-    role = await repository.role.get_role_by_name(name=role_name)
+    role = await repository.role.get_cached_by_name(name=role_name)
     if not role:
         raise NameNotFoundException(Role, name=role_name)
     return role
 
 
 async def get_role_by_id(role_id: Annotated[UUID, Path(title="The UUID id of the role")]) -> Role:
-    role = await repository.role.get(id=role_id)
+    role = await repository.role.get_cached(id=role_id)
     if not role:
         raise IdNotFoundException(Role, id=role_id)
     return role
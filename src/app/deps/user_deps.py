@@ -16,7 +16,7 @@ async def user_exists(user: IUserCreate) -> IUserCreate:
 
 
 async def email_exists(user: IUserCreate) -> IUserCreate:
-    is_user = await repository.user.get_by_email(email=user.email)
+    is_user = await repository.user.get_by_email(email=user.email, profile="bare")
     if is_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -26,7 +26,10 @@ async def email_exists(user: IUserCreate) -> IUserCreate:
 
 
 async def username_exists(user: IUserCreate) -> IUserCreate:
-    is_user = await repository.user.get_by_username(username=user.username)
+    is_user = await repository.user.get_by_username(
+        username=user.username,
+        profile="bare",
+    )
     if is_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -38,7 +41,7 @@ async def username_exists(user: IUserCreate) -> IUserCreate:
 async def is_valid_user(
     user_id: Annotated[UUID, Path(title="The UUID id of the user")],
 ) -> IUserRead:
-    user = await repository.user.get(id=user_id)
+    user = await repository.user.get(id=user_id, profile="bare")
     if not user:
         raise IdNotFoundException(User, id=user_id)
 
@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x0fmail/mail.proto\x12\x07mail.v1">\n\x1bSendEmailWithOTPCodeRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08otp_code\x18\x02 \x01(\t",\n\x08Response\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08"2\n\rErrorResponse\x12\x10\n\x08messages\x18\x01 \x03(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x32\xbb\x01\n\x0bMailService\x12W\n\x1cSendConfirmationEmailOTPCode\x12$.mail.v1.SendEmailWithOTPCodeRequest\x1a\x11.mail.v1.Response\x12S\n\x18SendPasswordResetOTPCode\x12$.mail.v1.SendEmailWithOTPCodeRequest\x1a\x11.mail.v1.ResponseB&Z$github.com/8thgencore/mailfort/protob\x06proto3',
+    b'\n\x0fmail/mail.proto\x12\x07mail.v1">\n\x1bSendEmailWithOTPCodeRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08otp_code\x18\x02 \x01(\t",\n\x08Response\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08"Y\n!SendEmailsWithOTPCodeBatchRequest\x12\x34\n\x06\x65mails\x18\x01 \x03(\x0b\x32$.mail.v1.SendEmailWithOTPCodeRequest"B\n\x0fSendEmailResult\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t":\n\rBatchResponse\x12)\n\x07results\x18\x01 \x03(\x0b\x32\x18.mail.v1.SendEmailResult"2\n\rErrorResponse\x12\x10\n\x08messages\x18\x01 \x03(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x32\xa4\x02\n\x0bMailService\x12W\n\x1cSendConfirmationEmailOTPCode\x12$.mail.v1.SendEmailWithOTPCodeRequest\x1a\x11.mail.v1.Response\x12S\n\x18SendPasswordResetOTPCode\x12$.mail.v1.SendEmailWithOTPCodeRequest\x1a\x11.mail.v1.Response\x12g\n!SendConfirmationEmailOTPCodeBatch\x12*.mail.v1.SendEmailsWithOTPCodeBatchRequest\x1a\x16.mail.v1.BatchResponseB&Z$github.com/8thgencore/mailfort/protob\x06proto3'
 )
 
 _globals = globals()
@@ -27,8 +27,14 @@ if not _descriptor._USE_C_DESCRIPTORS:
     _globals["_SENDEMAILWITHOTPCODEREQUEST"]._serialized_end = 90
     _globals["_RESPONSE"]._serialized_start = 92
     _globals["_RESPONSE"]._serialized_end = 136
-    _globals["_ERRORRESPONSE"]._serialized_start = 138
-    _globals["_ERRORRESPONSE"]._serialized_end = 188
-    _globals["_MAILSERVICE"]._serialized_start = 191
-    _globals["_MAILSERVICE"]._serialized_end = 378
+    _globals["_SENDEMAILSWITHOTPCODEBATCHREQUEST"]._serialized_start = 138
+    _globals["_SENDEMAILSWITHOTPCODEBATCHREQUEST"]._serialized_end = 227
+    _globals["_SENDEMAILRESULT"]._serialized_start = 229
+    _globals["_SENDEMAILRESULT"]._serialized_end = 295
+    _globals["_BATCHRESPONSE"]._serialized_start = 297
+    _globals["_BATCHRESPONSE"]._serialized_end = 355
+    _globals["_ERRORRESPONSE"]._serialized_start = 357
+    _globals["_ERRORRESPONSE"]._serialized_end = 407
+    _globals["_MAILSERVICE"]._serialized_start = 410
+    _globals["_MAILSERVICE"]._serialized_end = 702
 # @@protoc_insertion_point(module_scope)
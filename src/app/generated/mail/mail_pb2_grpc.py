@@ -55,6 +55,12 @@ class MailServiceStub:
             response_deserializer=mail_dot_mail__pb2.Response.FromString,
             _registered_method=True,
         )
+        self.SendConfirmationEmailOTPCodeBatch = channel.unary_unary(
+            "/mail.v1.MailService/SendConfirmationEmailOTPCodeBatch",
+            request_serializer=mail_dot_mail__pb2.SendEmailsWithOTPCodeBatchRequest.SerializeToString,
+            response_deserializer=mail_dot_mail__pb2.BatchResponse.FromString,
+            _registered_method=True,
+        )
 
 
 class MailServiceServicer:
@@ -72,6 +78,12 @@ class MailServiceServicer:
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def SendConfirmationEmailOTPCodeBatch(self, request, context):
+        """Sends confirmation email otp codes in one call."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_MailServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -85,6 +97,11 @@ def add_MailServiceServicer_to_server(servicer, server):
             request_deserializer=mail_dot_mail__pb2.SendEmailWithOTPCodeRequest.FromString,
             response_serializer=mail_dot_mail__pb2.Response.SerializeToString,
         ),
+        "SendConfirmationEmailOTPCodeBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.SendConfirmationEmailOTPCodeBatch,
+            request_deserializer=mail_dot_mail__pb2.SendEmailsWithOTPCodeBatchRequest.FromString,
+            response_serializer=mail_dot_mail__pb2.BatchResponse.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "mail.v1.MailService",
@@ -156,3 +173,33 @@ class MailService:
             metadata,
             _registered_method=True,
         )
+
+    @staticmethod
+    def SendConfirmationEmailOTPCodeBatch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/mail.v1.MailService/SendConfirmationEmailOTPCodeBatch",
+            mail_dot_mail__pb2.SendEmailsWithOTPCodeBatchRequest.SerializeToString,
+            mail_dot_mail__pb2.BatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
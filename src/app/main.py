@@ -2,7 +2,8 @@
 Main FastAPI app instance declaration
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,25 +11,50 @@ from fastapi_async_sqlalchemy import SQLAlchemyMiddleware
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from loguru import logger
+from redis.asyncio import Redis
 
-from app.api.deps import get_redis_client
 from app.api.v1.api import api_router as api_router_v1
 from app.core.config import settings
 from app.core.logging import configure_logging
+from app.db.redis_pool import (
+    close_redis_pools,
+    get_cache_redis_pool,
+    get_redis_pool,
+    init_redis_pools,
+)
+from app.db.session import engine
 from app.utils.celery_utils import create_celery
+from app.utils.password_hasher import password_hasher
+from app.utils.two_tier_cache import listen_for_invalidations
+from app.utils.upload import shutdown_upload_executor
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
-    redis_client = await get_redis_client()
+    logger.info("Init redis connection pools")
+    await init_redis_pools()
+
     logger.info("Init fastapi cache")
-    FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+    cache_redis_client = Redis(connection_pool=get_cache_redis_pool())
+    FastAPICache.init(RedisBackend(cache_redis_client), prefix="fastapi-cache")
+
+    logger.info("Listen for cache invalidations")
+    invalidation_listener = asyncio.create_task(
+        listen_for_invalidations(Redis(connection_pool=get_redis_pool())),
+    )
 
     yield
 
     logger.info("Shutting down...")
-    await FastAPICache.clear()
+    invalidation_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await invalidation_listener
+    # The cache is shared by every worker, it must not be cleared when one stops
+    await close_redis_pools()
+    await engine.dispose()
+    shutdown_upload_executor()
+    password_hasher.shutdown()
 
 
 # Initialize the application and create a FastAPI instance
@@ -51,16 +77,7 @@ def create_application() -> FastAPI:
     app.celery_app = create_celery()
 
     # Add SQLAlchemyMiddleware to the application
-    app.add_middleware(
-        SQLAlchemyMiddleware,
-        db_url=settings.database.ASYNC_DATABASE_URI,
-        engine_args={
-            "echo": False,
-            "pool_pre_ping": True,
-            "pool_size": 4,
-            "max_overflow": 64,
-        },
-    )
+    app.add_middleware(SQLAlchemyMiddleware, custom_engine=engine)
 
     # If there are any CORS enabled origins, add a CORSMiddleware to the application
     if settings.srv.BACKEND_CORS_ORIGINS:
@@ -1,4 +1,5 @@
 from .image_media_model import ImageMedia
+from .image_rendition_model import ImageRendition
 from .links_model import ProjectUserLink
 from .media_model import Media
 from .project_model import Project
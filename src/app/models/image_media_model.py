@@ -20,3 +20,10 @@ class ImageMedia(BaseUUIDModel, ImageMediaBase, table=True):
             "primaryjoin": "ImageMedia.media_id==Media.id",
         },
     )
+    renditions: list["ImageRendition"] = Relationship(  # noqa: F821
+        sa_relationship_kwargs={
+            # Only loaded for the responses returning them
+            "lazy": "noload",
+            "order_by": "(ImageRendition.size, ImageRendition.file_format)",
+        },
+    )
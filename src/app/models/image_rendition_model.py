@@ -0,0 +1,24 @@
+from uuid import UUID
+
+from sqlmodel import Field, Relationship, SQLModel
+
+from app.models.base_uuid_model import BaseUUIDModel
+from app.models.media_model import Media
+
+
+class ImageRenditionBase(SQLModel):
+    size: int  # side of the square rendition in pixels
+    file_format: str
+    width: int
+    height: int
+
+
+class ImageRendition(BaseUUIDModel, ImageRenditionBase, table=True):
+    image_media_id: UUID = Field(foreign_key="ImageMedia.id", index=True)
+    media_id: UUID | None = Field(default=None, foreign_key="Media.id")
+    media: Media = Relationship(
+        sa_relationship_kwargs={
+            "lazy": "joined",
+            "primaryjoin": "ImageRendition.media_id==Media.id",
+        },
+    )
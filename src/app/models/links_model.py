@@ -18,5 +18,6 @@ class ProjectUserLink(SQLModel, table=True):
         foreign_key="User.id",
         primary_key=True,
         nullable=False,
+        index=True,
     )
     joined_at: datetime | None = Field(default=datetime.now())
@@ -1,5 +1,5 @@
 from pydantic import computed_field
-from sqlmodel import SQLModel
+from sqlmodel import Field, SQLModel
 
 from app import api
 from app.core.config import settings
@@ -14,6 +14,9 @@ class MediaBase(SQLModel):
 
 
 class Media(BaseUUIDModel, MediaBase, table=True):
+    # sha256 of the uploaded bytes, identical uploads reuse the stored object
+    content_hash: str | None = Field(default=None, index=True)
+
     @computed_field
     @property
     def link(self) -> str | None:
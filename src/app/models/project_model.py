@@ -1,5 +1,6 @@
 from uuid import UUID
 
+from sqlalchemy import Column, Computed, Float
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base_uuid_model import BaseUUIDModel
@@ -7,17 +8,33 @@ from app.models.links_model import ProjectUserLink
 from app.models.task_model import Task
 from app.models.user_model import User
 
+PERCENT_COMPLETED_EXPRESSION = (
+    "CASE WHEN tasks_total = 0 THEN 0 "
+    "ELSE round(tasks_done::numeric / tasks_total, 2)::double precision END"
+)
+
 
 class ProjectBase(SQLModel):
     name: str
     description: str
     link: str
-    percent_completed: float = Field(default=0)
 
 
 class Project(BaseUUIDModel, ProjectBase, table=True):
     # created_by_id: UUID | None = Field(default=None, foreign_key="User.id")
     created_by_id: UUID | None = Field(default=None)
+    # Maintained by statement-level triggers on Task, see reconcile_project_task_counters
+    tasks_total: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    tasks_done: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Generated by the database, it is never written
+    percent_completed: float | None = Field(
+        default=None,
+        sa_column=Column(
+            Float,
+            Computed(PERCENT_COMPLETED_EXPRESSION, persisted=True),
+            nullable=False,
+        ),
+    )
 
     users: list["User"] = Relationship(  # noqa: F821
         back_populates="projects",
@@ -16,7 +16,7 @@ class TaskBase(SQLModel):
 class Task(BaseUUIDModel, TaskBase, table=True):
     created_by_id: UUID | None = Field(default=None, foreign_key="User.id")
 
-    project_id: UUID | None = Field(default=None, foreign_key="Project.id")
+    project_id: UUID | None = Field(default=None, foreign_key="Project.id", index=True)
     project: Optional["Project"] = Relationship(  # noqa: F821
         back_populates="tasks",
         sa_relationship_kwargs={"lazy": "joined"},
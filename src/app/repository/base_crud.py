@@ -1,3 +1,4 @@
+from collections.abc import Mapping, Sequence
 from typing import Any, Generic, TypeVar
 from uuid import UUID
 
@@ -6,12 +7,18 @@ from fastapi_async_sqlalchemy import db
 from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlmodel import paginate
 from pydantic import BaseModel
-from sqlalchemy import exc
+from sqlalchemy import exc, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.base import ExecutableOption
 from sqlmodel import SQLModel, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import Select
 
 from app.schemas.common_schema import IOrderEnum
+from app.schemas.response_schema import CursorPageBase, CursorParams
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.projection import get_projection
+from app.utils.response_cache import invalidate_cache_tags
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -19,29 +26,57 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 T = TypeVar("T", bound=SQLModel)
 
+LoaderProfiles = Mapping[str, Sequence[ExecutableOption]]
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: type[ModelType]):
+    def __init__(
+        self,
+        model: type[ModelType],
+        loader_profiles: LoaderProfiles | None = None,
+        cache_tags: Sequence[str] = (),
+    ):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
         **Parameters**
         * `model`: A SQLModel model class
-        * `schema`: A Pydantic model (schema) class
+        * `loader_profiles`: Named sets of relationship loader options, e.g. "bare" or "full"
+        * `cache_tags`: Response cache tags also invalidated by writes, besides the model's own
         """
         self.model = model
+        self.loader_profiles = loader_profiles or {}
+        self.cache_tags = (model.__tablename__, *cache_tags)
         self.db = db
 
     def get_db(self) -> type(db):
         return self.db
 
+    def get_loader_options(self, profile: str | None) -> Sequence[ExecutableOption]:
+        """Returns the loader options of a profile, `None` keeps the model defaults."""
+        if profile is None:
+            return ()
+        try:
+            return self.loader_profiles[profile]
+        except KeyError:
+            raise ValueError(f"Unknown loader profile '{profile}' for {self.model.__name__}")
+
+    async def invalidate_cache(self, *tags: str) -> None:
+        """Drops the cached responses built from this model, call it after committing."""
+        await invalidate_cache_tags(*self.cache_tags, *tags)
+
     async def get(
         self,
         *,
         id: UUID | str,
+        profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> ModelType | None:
         db_session = db_session or self.db.session
-        query = select(self.model).where(self.model.id == id)
+        query = (
+            select(self.model)
+            .where(self.model.id == id)
+            .options(*self.get_loader_options(profile))
+        )
         response = await db_session.execute(query)
         return response.scalar_one_or_none()
 
@@ -49,10 +84,15 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self,
         *,
         list_ids: list[UUID | str],
+        profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> list[ModelType] | None:
         db_session = db_session or self.db.session
-        response = await db_session.execute(select(self.model).where(self.model.id.in_(list_ids)))
+        response = await db_session.execute(
+            select(self.model)
+            .where(self.model.id.in_(list_ids))
+            .options(*self.get_loader_options(profile)),
+        )
         return response.scalars().all()
 
     async def get_count(self, db_session: AsyncSession | None = None) -> ModelType | None:
@@ -68,12 +108,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         skip: int = 0,
         limit: int = 100,
         query: T | Select[T] | None = None,
+        profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> list[ModelType]:
         db_session = db_session or self.db.session
         if query is None:
             query = select(self.model).offset(skip).limit(limit).order_by(self.model.id)
-        response = await db_session.execute(query)
+        response = await db_session.execute(query.options(*self.get_loader_options(profile)))
         return response.scalars().all()
 
     async def get_multi_ordered(
@@ -83,6 +124,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         order: IOrderEnum | None = IOrderEnum.ascendent,
         skip: int = 0,
         limit: int = 100,
+        profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> list[ModelType]:
         db_session = db_session or self.db.session
@@ -96,19 +138,45 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             query = select(self.model).offset(skip).limit(limit).order_by(columns[order_by].desc())
 
-        response = await db_session.execute(query)
+        response = await db_session.execute(query.options(*self.get_loader_options(profile)))
         return response.scalars().all()
 
+    async def paginate_projected(
+        self,
+        db_session: AsyncSession,
+        query: Select,
+        params: Params,
+        schema: type[SchemaType],
+    ) -> Page[SchemaType]:
+        projection = get_projection(self.model, schema)
+
+        async def hydrate(rows: Sequence[Any]) -> list[SchemaType]:
+            return await projection.hydrate(db_session, rows)
+
+        return await paginate(db_session, query, params, transformer=hydrate)
+
     async def get_multi_paginated(
         self,
         *,
         params: Params | None = Params(),
         query: T | Select[T] | None = None,
+        profile: str | None = None,
+        schema: type[SchemaType] | None = None,
         db_session: AsyncSession | None = None,
-    ) -> Page[ModelType]:
+    ) -> Page[ModelType] | Page[SchemaType]:
+        """Pages of entities, or of `schema` read from only the columns it needs.
+
+        With a `schema`, a custom query must be built from `get_projection(model, schema)`.
+        """
         db_session = db_session or self.db.session
+        if schema is not None:
+            if query is None:
+                query = get_projection(self.model, schema).select()
+            return await self.paginate_projected(db_session, query, params, schema)
+
         if query is None:
             query = select(self.model)
+        query = query.options(*self.get_loader_options(profile))
         return await paginate(db_session, query, params)
 
     async def get_multi_paginated_ordered(
@@ -118,8 +186,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         order_by: str | None = None,
         order: IOrderEnum | None = IOrderEnum.ascendent,
         query: T | Select[T] | None = None,
+        profile: str | None = None,
+        schema: type[SchemaType] | None = None,
         db_session: AsyncSession | None = None,
-    ) -> Page[ModelType]:
+    ) -> Page[ModelType] | Page[SchemaType]:
         db_session = db_session or self.db.session
 
         columns = self.model.__table__.columns
@@ -128,13 +198,89 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             order_by = self.model.id
 
         if query is None:
+            if schema is not None:
+                query = get_projection(self.model, schema).select()
+            else:
+                query = select(self.model)
             if order == IOrderEnum.ascendent:
-                query = select(self.model).order_by(columns[order_by].asc())
+                query = query.order_by(columns[order_by].asc())
             else:
-                query = select(self.model).order_by(columns[order_by].desc())
+                query = query.order_by(columns[order_by].desc())
+
+        if schema is not None:
+            return await self.paginate_projected(db_session, query, params, schema)
 
+        query = query.options(*self.get_loader_options(profile))
         return await paginate(db_session, query, params)
 
+    async def get_multi_cursor_paginated(
+        self,
+        *,
+        params: CursorParams | None = CursorParams(),
+        order: IOrderEnum | None = IOrderEnum.ascendent,
+        keyset: Sequence[InstrumentedAttribute] | None = None,
+        query: T | Select[T] | None = None,
+        profile: str | None = None,
+        schema: type[SchemaType] | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> CursorPageBase[ModelType] | CursorPageBase[SchemaType]:
+        """Keyset pagination, each page is an index range scan without OFFSET.
+
+        The `keyset` columns must be unique together, not nullable and covered by an index. By
+        default it is the primary key, a uuid7 ordered by creation time. Custom queries must
+        select the keyset columns. With a `schema`, the items are read
+        from only the columns it needs, like `get_multi_paginated`.
+        """
+        db_session = db_session or self.db.session
+        if keyset is None:
+            keyset = (self.model.id,)
+        if query is None:
+            if schema is not None:
+                query = get_projection(self.model, schema).select(*keyset)
+            else:
+                query = select(self.model)
+
+        total = None
+        if params.with_total:
+            response = await db_session.execute(
+                select(func.count()).select_from(query.order_by(None).subquery()),
+            )
+            total = response.scalar_one()
+
+        if params.cursor:
+            values = decode_cursor(params.cursor, len(keyset))
+            if order == IOrderEnum.ascendent:
+                query = query.where(tuple_(*keyset) > tuple_(*values))
+            else:
+                query = query.where(tuple_(*keyset) < tuple_(*values))
+
+        if order == IOrderEnum.ascendent:
+            query = query.order_by(None).order_by(*[column.asc() for column in keyset])
+        else:
+            query = query.order_by(None).order_by(*[column.desc() for column in keyset])
+
+        query = query.options(*self.get_loader_options(profile))
+        response = await db_session.execute(query.limit(params.size + 1))
+        if len(query.column_descriptions) == 1:
+            items = response.scalars().all()
+        else:
+            items = response.all()
+
+        next_cursor = None
+        if len(items) > params.size:
+            items = items[: params.size]
+            next_cursor = encode_cursor([getattr(items[-1], column.key) for column in keyset])
+
+        if schema is not None:
+            items = await get_projection(self.model, schema).hydrate(db_session, items)
+
+        return CursorPageBase(
+            items=items,
+            size=params.size,
+            next_cursor=next_cursor,
+            total=total,
+        )
+
     async def create(
         self,
         *,
@@ -157,6 +303,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 detail="Resource already exists",
             )
         await db_session.refresh(db_obj)
+        await self.invalidate_cache()
         return db_obj
 
     async def update(
@@ -181,6 +328,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_session.add(obj_current)
         await db_session.commit()
         await db_session.refresh(obj_current)
+        await self.invalidate_cache()
         return obj_current
 
     async def remove(self, *, id: UUID | str, db_session: AsyncSession | None = None) -> ModelType:
@@ -190,4 +338,5 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         await db_session.delete(obj)
         await db_session.commit()
+        await self.invalidate_cache()
         return obj
@@ -1,10 +1,56 @@
+from collections import defaultdict
+from uuid import UUID
+
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
 from app.models.image_media_model import ImageMedia
+from app.models.image_rendition_model import ImageRendition
+from app.models.media_model import Media
 from app.repository.base_crud import CRUDBase
 from app.schemas.image_media_schema import IImageMediaCreate, IImageMediaUpdate
 
 
 class CRUDImageMedia(CRUDBase[ImageMedia, IImageMediaCreate, IImageMediaUpdate]):
-    pass
+    async def get_by_content_hash(
+        self,
+        *,
+        content_hash: str,
+        db_session: AsyncSession | None = None,
+    ) -> ImageMedia | None:
+        db_session = db_session or super().get_db().session
+        response = await db_session.execute(
+            select(ImageMedia)
+            .join(Media, ImageMedia.media_id == Media.id)
+            .where(Media.content_hash == content_hash)
+            .order_by(ImageMedia.created_at)
+            .limit(1),
+        )
+        return response.scalars().first()
+
+    async def load_renditions(
+        self,
+        *,
+        images: list[ImageMedia | None],
+        db_session: AsyncSession | None = None,
+    ) -> None:
+        """Loads the renditions of images already loaded without them in one query."""
+        images = {image.id: image for image in images if image is not None}
+        if not images:
+            return
+
+        db_session = db_session or super().get_db().session
+        response = await db_session.execute(
+            select(ImageRendition)
+            .where(ImageRendition.image_media_id.in_(images))
+            .order_by(ImageRendition.size, ImageRendition.file_format),
+        )
+        renditions: dict[UUID, list[ImageRendition]] = defaultdict(list)
+        for rendition in response.scalars():
+            renditions[rendition.image_media_id].append(rendition)
+        for id, image in images.items():
+            set_committed_value(image, "renditions", renditions[id])
 
 
 image = CRUDImageMedia(ImageMedia)
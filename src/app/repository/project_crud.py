@@ -1,18 +1,23 @@
+from uuid import UUID
+
 from fastapi_pagination import Params
-from sqlalchemy.orm import selectinload
-from sqlmodel import and_, func, select
+from sqlalchemy.orm import noload, selectinload
+from sqlmodel import and_, delete, exists, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models import Project, ProjectUserLink, Task, User
 from app.repository.base_crud import CRUDBase
+from app.repository.user_crud import USER_IMAGE_RENDITIONS
+from app.schemas.common_schema import IDeleteCounts
 from app.schemas.project_schema import (
     IProjectCreate,
-    IProjectRead,
     IProjectUpdate,
     IProjectWithUsers,
 )
 from app.schemas.statistics_schema import StatisticsRead
 from app.schemas.task_schema import ITaskRead
+from app.schemas.user_schema import IUserRead
+from app.utils.membership_cache import invalidate_membership
 
 
 class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
@@ -36,6 +41,7 @@ class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
         )
         db_session.add(project_user_link)
         await db_session.commit()
+        await self.invalidate_cache()
 
         await db_session.refresh(db_obj)
         return db_obj
@@ -49,58 +55,89 @@ class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
     ) -> list[IProjectWithUsers]:
         db_session = db_session or super().get_db().session
 
-        query = (
-            select(Project)
-            .where(Project.users.contains(user))
-            .options(selectinload(Project.users))
+        query = select(Project).where(Project.users.contains(user))
+        projects = await super().get_multi_paginated(
+            params=params,
+            query=query,
+            profile="with_members",
         )
-        projects = await super().get_multi_paginated(params=params, query=query)
         return projects
 
     async def remove(self, *, id: str, db_session: AsyncSession | None = None) -> Project:
+        project, _ = await self.remove_cascade(id=id, db_session=db_session)
+        return project
+
+    async def remove_cascade(
+        self,
+        *,
+        id: str,
+        db_session: AsyncSession | None = None,
+    ) -> tuple[Project, IDeleteCounts]:
+        """Deletes the project with its links and tasks using set-based statements."""
         db_session = db_session or super().get_db().session
 
-        # delete links
         response = await db_session.execute(
-            select(ProjectUserLink).where(ProjectUserLink.project_id == id),
+            select(Project)
+            .where(Project.id == id)
+            .options(noload(Project.users), noload(Project.tasks)),
+        )
+        obj = response.scalar_one()
+
+        # delete links
+        links = await db_session.execute(
+            delete(ProjectUserLink)
+            .where(ProjectUserLink.project_id == id)
+            .execution_options(synchronize_session=False),
         )
-        obj = response.scalars().all()
-        for ob in obj:
-            await db_session.delete(ob)
 
         # delete all task project
-        response = await db_session.execute(select(Task).where(Task.project_id == id))
-        obj = response.scalars().all()
-        for ob in obj:
-            await db_session.delete(ob)
+        tasks = await db_session.execute(
+            delete(Task).where(Task.project_id == id).execution_options(synchronize_session=False),
+        )
 
         # delete project
-        response = await db_session.execute(select(Project).where(Project.id == id))
-        obj = response.scalar_one()
-        await db_session.delete(obj)
+        await db_session.execute(delete(Project).where(Project.id == id))
 
         await db_session.commit()
-        return obj
+        await invalidate_membership(project_id=id)
+        await self.invalidate_cache(Task.__tablename__)
+        return obj, IDeleteCounts(links=links.rowcount, tasks=tasks.rowcount)
 
-    async def is_member_project(
+    async def get_membership(
         self,
         *,
-        user_id: str,
-        project_id: str,
+        user_id: UUID | str,
+        project_id: UUID | str,
         db_session: AsyncSession | None = None,
-    ) -> bool:
+    ) -> tuple[bool, bool]:
+        """Returns whether the project exists and whether the user is a member of it."""
         db_session = db_session or super().get_db().session
 
-        query = select(ProjectUserLink).where(
+        project_exists = exists().where(Project.id == project_id)
+        is_member = exists().where(
             and_(
                 ProjectUserLink.user_id == user_id,
                 ProjectUserLink.project_id == project_id,
             ),
         )
-        response = await db_session.execute(query)
-        obj = response.scalar_one_or_none()
+        response = await db_session.execute(select(project_exists, is_member))
+        project_exists, is_member = response.one()
 
-        return True if obj else False
+        return project_exists, is_member
+
+    async def is_member_project(
+        self,
+        *,
+        user_id: str,
+        project_id: str,
+        db_session: AsyncSession | None = None,
+    ) -> bool:
+        _, is_member = await self.get_membership(
+            user_id=user_id,
+            project_id=project_id,
+            db_session=db_session,
+        )
+        return is_member
 
     async def join_the_project(
         self,
@@ -117,6 +154,8 @@ class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
         )
         db_session.add(project_user_link)
         await db_session.commit()
+        await invalidate_membership(user_id=user.id, project_id=project.id)
+        await self.invalidate_cache()
         await db_session.refresh(project)
         return project
 
@@ -142,6 +181,8 @@ class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
             await db_session.delete(obj)
         await db_session.refresh(project)
         await db_session.commit()
+        await invalidate_membership(user_id=user.id, project_id=project.id)
+        await self.invalidate_cache()
         return project
 
     async def get_tasks(
@@ -152,36 +193,38 @@ class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
     ) -> list[ITaskRead]:
         db_session = db_session or super().get_db().session
 
-        query = select(Task).where(Task.project_id == project_id)
+        query = select(Task).where(Task.project_id == project_id).options(noload(Task.project))
         tasks = await super().get_multi_paginated(query=query)
         return tasks
 
     async def get_members(
         self,
         *,
-        project: IProjectRead,
+        project_id: UUID | str,
         db_session: AsyncSession | None = None,
-    ) -> list[ITaskRead]:
+    ) -> list[IUserRead]:
         db_session = db_session or super().get_db().session
 
-        query = select(User).where(User.projects.contains(project))
-        tasks = await super().get_multi_paginated(query=query)
-        return tasks
+        query = (
+            select(User)
+            .join(ProjectUserLink, ProjectUserLink.user_id == User.id)
+            .where(ProjectUserLink.project_id == project_id)
+            .options(noload(User.projects), USER_IMAGE_RENDITIONS)
+        )
+        members = await super().get_multi_paginated(query=query)
+        return members
 
-    async def get_stats(self, *, db_session: AsyncSession | None = None) -> list[ITaskRead]:
+    async def get_stats(self, *, db_session: AsyncSession | None = None) -> StatisticsRead:
         db_session = db_session or super().get_db().session
 
-        projects_count = await super().get_count()
-
         result = await db_session.execute(
-            select(func.count(Project.id)).where(Project.percent_completed == 0),
-        )
-        missing_count = result.scalar()
-
-        result = await db_session.execute(
-            select(func.count(Project.id)).where(Project.percent_completed == 1),
+            select(
+                func.count(Project.id),
+                func.count(Project.id).filter(Project.percent_completed == 0),
+                func.count(Project.id).filter(Project.percent_completed == 1),
+            ),
         )
-        completed_count = result.scalar()
+        projects_count, missing_count, completed_count = result.one()
 
         stats = StatisticsRead(
             projects_count=projects_count,
@@ -193,4 +236,22 @@ class CRUDProject(CRUDBase[Project, IProjectCreate, IProjectUpdate]):
         return stats
 
 
-project = CRUDProject(Project)
+project = CRUDProject(
+    Project,
+    loader_profiles={
+        "bare": (noload(Project.users), noload(Project.tasks)),
+        "with_members": (
+            selectinload(Project.users).options(noload(User.projects), USER_IMAGE_RENDITIONS),
+            noload(Project.tasks),
+        ),
+        "with_tasks": (
+            noload(Project.users),
+            selectinload(Project.tasks).lazyload(Task.project),
+        ),
+        "full": (
+            selectinload(Project.users).options(noload(User.projects), USER_IMAGE_RENDITIONS),
+            selectinload(Project.tasks).lazyload(Task.project),
+        ),
+    },
+    cache_tags=(ProjectUserLink.__tablename__,),
+)
@@ -1,29 +1,101 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
 from uuid import UUID
 
+from redis.asyncio import Redis
+from sqlalchemy.orm import noload, selectinload
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
+from app.db.redis_pool import get_redis_pool
 from app.models.role_model import Role
 from app.models.user_model import User
 from app.repository.base_crud import CRUDBase
 from app.schemas.role_schema import IRoleCreate, IRoleUpdate
+from app.utils.two_tier_cache import TwoTierCache
+
+role_cache = TwoTierCache(
+    "role",
+    ttl=settings.srv.ROLE_CACHE_TTL_SECONDS,
+    maxsize=settings.srv.ROLE_CACHE_MAX_SIZE,
+    redis_ttl=settings.srv.ROLE_CACHE_REDIS_TTL_SECONDS,
+)
 
 
 class CRUDRole(CRUDBase[Role, IRoleCreate, IRoleUpdate]):
-    async def get_role_by_name(self, *, name: str, db_session: AsyncSession | None = None) -> Role:
+    async def get_role_by_name(
+        self,
+        *,
+        name: str,
+        profile: str | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> Role:
         db_session = db_session or super().get_db().session
-        role = await db_session.execute(select(Role).where(Role.name == name))
+        role = await db_session.execute(
+            select(Role).where(Role.name == name).options(*self.get_loader_options(profile)),
+        )
         return role.scalar_one_or_none()
 
+    async def _get_cached(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Role | None]],
+    ) -> Role | None:
+        async def loader() -> dict[str, Any] | None:
+            role = await load()
+            return role.model_dump(mode="json") if role else None
+
+        redis_client = Redis(connection_pool=get_redis_pool())
+        data = await role_cache.get_or_load(redis_client, key, loader)
+        # Detached from the session, without users
+        return Role.model_validate(data) if data else None
+
+    async def get_cached(self, *, id: UUID | str) -> Role | None:
+        return await self._get_cached(f"id:{id}", lambda: self.get(id=id, profile="bare"))
+
+    async def get_cached_by_name(self, *, name: str) -> Role | None:
+        return await self._get_cached(
+            f"name:{name}",
+            lambda: self.get_role_by_name(name=name, profile="bare"),
+        )
+
+    async def invalidate_cache(self, *tags: str) -> None:
+        await super().invalidate_cache(*tags)
+        await role_cache.invalidate(Redis(connection_pool=get_redis_pool()))
+
+    async def update(
+        self,
+        *,
+        obj_current: Role,
+        obj_new: IRoleUpdate | dict[str, Any] | Role,
+        db_session: AsyncSession | None = None,
+    ) -> Role:
+        db_session = db_session or super().get_db().session
+        # A cached role is not attached to the session, update the stored one
+        obj_current = await self.get(id=obj_current.id, profile="bare", db_session=db_session)
+        return await super().update(
+            obj_current=obj_current,
+            obj_new=obj_new,
+            db_session=db_session,
+        )
+
     async def add_role_to_user(self, *, user: User, role_id: UUID) -> Role:
         db_session = super().get_db().session
 
-        role = await super().get(id=role_id)
+        role = await super().get(id=role_id, profile="with_users")
         role.users.append(user)
         db_session.add(role)
         await db_session.commit()
         await db_session.refresh(role)
+        await self.invalidate_cache(User.__tablename__)
         return role
 
 
-role = CRUDRole(Role)
+role = CRUDRole(
+    Role,
+    loader_profiles={
+        "bare": (noload(Role.users),),
+        "with_users": (selectinload(Role.users).noload(User.projects),),
+    },
+)
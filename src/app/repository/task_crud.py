@@ -1,11 +1,17 @@
 from datetime import datetime
+from uuid import UUID
 
-from sqlmodel import and_, select
+from fastapi_pagination import Params
+from sqlalchemy.orm import joinedload, noload
+from sqlmodel import and_
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
 
-from app.models import Project, Task, User
+from app.models import Project, ProjectUserLink, Task, User
 from app.repository.base_crud import CRUDBase
+from app.schemas.response_schema import CursorPageBase, CursorParams
 from app.schemas.task_schema import ITaskCreate, ITaskUpdate, ITaskWithProjectName
+from app.utils.projection import get_projection
 
 
 class CRUDTask(CRUDBase[Task, ITaskCreate, ITaskUpdate]):
@@ -24,106 +30,117 @@ class CRUDTask(CRUDBase[Task, ITaskCreate, ITaskUpdate]):
 
         await db_session.commit()
         await db_session.refresh(db_obj)
+        await self.invalidate_cache()
         return db_obj
 
+    def get_user_tasks_query(self, *, user_id: UUID | str) -> Select:
+        """Tasks of every project the user is a member of, with the project name.
+
+        Membership is resolved by joining through `ProjectUserLink` so the whole
+        listing is one statement instead of a project id prefetch plus `IN (...)`.
+        The columns are the projection of `ITaskWithProjectName`.
+        """
+        return (
+            get_projection(Task, ITaskWithProjectName)
+            .select()
+            .join(
+                ProjectUserLink,
+                and_(
+                    ProjectUserLink.project_id == Task.project_id,
+                    ProjectUserLink.user_id == user_id,
+                ),
+            )
+        )
+
     async def get_by_user(
         self,
         *,
+        params: Params | None = Params(),
         user: User,
         db_session: AsyncSession | None = None,
     ) -> list[ITaskWithProjectName]:
-        db_session = db_session or super().get_db().session
+        query = self.get_user_tasks_query(user_id=user.id).order_by(Task.created_at)
+        tasks = await super().get_multi_paginated(
+            params=params,
+            query=query,
+            schema=ITaskWithProjectName,
+            db_session=db_session,
+        )
 
-        # get user projects
-        query = select(Project.id).where(Project.users.contains(user))
-        response = await db_session.execute(query)
-        projects = response.scalars().all()
+        return tasks
 
-        # get user tasks
-        query = (
-            select(
-                Task.id,
-                Task.name,
-                Task.deadline,
-                Task.done,
-                Task.project_id,
-                Project.name.label("project_name"),
-            )
-            .where(Task.project_id.in_(projects))
-            .join(Project, Project.id == Task.project_id)
-            .order_by(Task.created_at)
+    async def get_by_user_cursor(
+        self,
+        *,
+        params: CursorParams | None = CursorParams(),
+        user: User,
+        db_session: AsyncSession | None = None,
+    ) -> CursorPageBase[ITaskWithProjectName]:
+        query = self.get_user_tasks_query(user_id=user.id)
+        tasks = await super().get_multi_cursor_paginated(
+            params=params,
+            query=query,
+            schema=ITaskWithProjectName,
+            db_session=db_session,
         )
-        tasks = await super().get_multi_paginated(query=query)
 
         return tasks
 
     async def get_not_completed_by_user(
         self,
         *,
+        params: Params | None = Params(),
         user: User,
         db_session: AsyncSession | None = None,
     ) -> list[ITaskWithProjectName]:
-        db_session = db_session or super().get_db().session
-
-        # get user projects
-        query = select(Project.id).where(Project.users.contains(user))
-        response = await db_session.execute(query)
-        projects = response.scalars().all()
-
-        # get user tasks
         query = (
-            select(
-                Task.id,
-                Task.name,
-                Task.deadline,
-                Task.done,
-                Task.project_id,
-                Project.name.label("project_name"),
-            )
-            .where(Task.project_id.in_(projects))
+            self.get_user_tasks_query(user_id=user.id)
             .where(Task.done == False)  # noqa
-            .join(Project, Project.id == Task.project_id)
             .order_by(Task.created_at)
         )
-        tasks = await super().get_multi_paginated(query=query)
+        tasks = await super().get_multi_paginated(
+            params=params,
+            query=query,
+            schema=ITaskWithProjectName,
+            db_session=db_session,
+        )
 
         return tasks
 
     async def get_by_deadline(
         self,
         *,
+        params: Params | None = Params(),
         user: User,
         date: datetime,
         db_session: AsyncSession | None = None,
     ) -> list[ITaskWithProjectName]:
-        db_session = db_session or super().get_db().session
-
-        # get user projects
-        query = select(Project.id).where(Project.users.contains(user))
-        response = await db_session.execute(query)
-        projects = response.scalars().all()
-
         date_from = datetime.fromordinal(date.toordinal())
         date_to = datetime.fromordinal(date.toordinal() + 1)
 
-        # get user tasks
         query = (
-            select(
-                Task.id,
-                Task.name,
-                Task.deadline,
-                Task.done,
-                Task.project_id,
-                Project.name.label("project_name"),
-            )
-            .where(Task.project_id.in_(projects))
+            self.get_user_tasks_query(user_id=user.id)
             .where(and_(Task.deadline > date_from, Task.deadline < date_to))
-            .join(Project, Project.id == Task.project_id)
             .order_by(Task.deadline)
         )
-        tasks = await super().get_multi_paginated(query=query)
+        tasks = await super().get_multi_paginated(
+            params=params,
+            query=query,
+            schema=ITaskWithProjectName,
+            db_session=db_session,
+        )
 
         return tasks
 
 
-task = CRUDTask(Task)
+task = CRUDTask(
+    Task,
+    loader_profiles={
+        "bare": (noload(Task.project),),
+        "with_project": (
+            joinedload(Task.project).options(noload(Project.users), noload(Project.tasks)),
+        ),
+    },
+    # The completion of a project is kept up to date by triggers on its tasks
+    cache_tags=(Project.__tablename__,),
+)
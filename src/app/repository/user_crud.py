@@ -1,19 +1,24 @@
 from typing import Any
 
 from pydantic.networks import EmailStr
-from sqlmodel import select
+from sqlalchemy.orm import defaultload, noload, selectinload
+from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
 from app.models.image_media_model import ImageMedia
 from app.models.links_model import ProjectUserLink
-from app.models.media_model import Media
 from app.models.project_model import Project
 from app.models.task_model import Task
 from app.models.user_model import User
 from app.repository.base_crud import CRUDBase
-from app.schemas.media_schema import IMediaCreate
+from app.schemas.common_schema import IDeleteCounts
 from app.schemas.user_schema import IUserCreate, IUserUpdate
+from app.utils.membership_cache import invalidate_membership
+from app.utils.password_hasher import password_hasher
+from app.utils.principal_cache import invalidate_principal
+
+# Loads the renditions returned with the image of the users, they are not loaded by default
+USER_IMAGE_RENDITIONS = defaultload(User.image).selectinload(ImageMedia.renditions)
 
 
 class CRUDUser(CRUDBase[User, IUserCreate, IUserUpdate]):
@@ -21,20 +26,28 @@ class CRUDUser(CRUDBase[User, IUserCreate, IUserUpdate]):
         self,
         *,
         email: str,
+        profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> User | None:
         db_session = db_session or super().get_db().session
-        user = await db_session.execute(select(User).where(User.email == email))
+        user = await db_session.execute(
+            select(User).where(User.email == email).options(*self.get_loader_options(profile)),
+        )
         return user.scalar_one_or_none()
 
     async def get_by_username(
         self,
         *,
         username: str,
+        profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> User | None:
         db_session = db_session or super().get_db().session
-        user = await db_session.execute(select(User).where(User.username == username))
+        user = await db_session.execute(
+            select(User)
+            .where(User.username == username)
+            .options(*self.get_loader_options(profile)),
+        )
         return user.scalar_one_or_none()
 
     async def create_with_role(
@@ -45,13 +58,29 @@ class CRUDUser(CRUDBase[User, IUserCreate, IUserUpdate]):
     ) -> User:
         db_session = db_session or super().get_db().session
         db_obj = User.from_orm(obj_in)
-        db_obj.hashed_password = get_password_hash(obj_in.password)
+        db_obj.hashed_password = await password_hasher.hash(obj_in.password)
 
         db_session.add(db_obj)
         await db_session.commit()
         await db_session.refresh(db_obj)
+        await self.invalidate_cache()
         return db_obj
 
+    async def update(
+        self,
+        *,
+        obj_current: User,
+        obj_new: IUserUpdate | dict[str, Any] | User,
+        db_session: AsyncSession | None = None,
+    ) -> User:
+        user = await super().update(
+            obj_current=obj_current,
+            obj_new=obj_new,
+            db_session=db_session,
+        )
+        await invalidate_principal(user.id)
+        return user
+
     async def update_is_active(
         self,
         *,
@@ -66,63 +95,88 @@ class CRUDUser(CRUDBase[User, IUserCreate, IUserUpdate]):
             db_session.add(x)
             await db_session.commit()
             await db_session.refresh(x)
+            await invalidate_principal(x.id)
             response.append(x)
+        await self.invalidate_cache()
         return response
 
     async def authenticate(self, *, email: EmailStr, password: str) -> User | None:
-        user = await self.get_by_email(email=email)
+        user = await self.get_by_email(email=email, profile="bare")
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
-    async def remove(self, *, id: str, db_session: AsyncSession | None = None) -> Project:
+    async def remove(self, *, id: str, db_session: AsyncSession | None = None) -> User:
+        user, _ = await self.remove_cascade(id=id, db_session=db_session)
+        return user
+
+    async def remove_cascade(
+        self,
+        *,
+        id: str,
+        db_session: AsyncSession | None = None,
+    ) -> tuple[User, IDeleteCounts]:
+        """Deletes the user with its links and created tasks using set-based statements."""
         db_session = db_session or super().get_db().session
 
-        # delete links
         response = await db_session.execute(
-            select(ProjectUserLink).where(ProjectUserLink.user_id == id),
+            select(User).where(User.id == id).options(*self.get_loader_options("bare")),
+        )
+        obj = response.scalar_one()
+
+        # delete links
+        links = await db_session.execute(
+            delete(ProjectUserLink)
+            .where(ProjectUserLink.user_id == id)
+            .execution_options(synchronize_session=False),
         )
-        obj = response.scalars().all()
-        for ob in obj:
-            await db_session.delete(ob)
 
         # delete all task project
-        response = await db_session.execute(select(Task).where(Task.created_by_id == id))
-        obj = response.scalars().all()
-        for ob in obj:
-            await db_session.delete(ob)
+        tasks = await db_session.execute(
+            delete(Task)
+            .where(Task.created_by_id == id)
+            .execution_options(synchronize_session=False),
+        )
 
         # delete user
-        response = await db_session.execute(select(User).where(User.id == id))
-        obj = response.scalar_one()
-        await db_session.delete(obj)
+        await db_session.execute(delete(User).where(User.id == id))
 
         await db_session.commit()
-        return obj
+        await invalidate_principal(id)
+        await invalidate_membership(user_id=id)
+        # Deleting tasks changes the completion of their projects
+        await self.invalidate_cache(
+            ProjectUserLink.__tablename__,
+            Task.__tablename__,
+            Project.__tablename__,
+        )
+        return obj, IDeleteCounts(links=links.rowcount, tasks=tasks.rowcount)
 
     async def update_photo(
         self,
         *,
         user: User,
-        image: IMediaCreate,
-        heigth: int,
-        width: int,
-        file_format: str,
+        image: ImageMedia,
     ) -> User:
         db_session = super().get_db().session
 
-        user.image = ImageMedia(
-            media=Media.from_orm(image),
-            height=heigth,
-            width=width,
-            file_format=file_format,
-        )
+        user.image = image
         db_session.add(user)
         await db_session.commit()
         await db_session.refresh(user)
+        await invalidate_principal(user.id)
+        await self.invalidate_cache()
         return user
 
 
-user = CRUDUser(User)
+user = CRUDUser(
+    User,
+    loader_profiles={
+        "bare": (noload(User.projects),),
+        "with_projects": (
+            selectinload(User.projects).options(noload(Project.users), noload(Project.tasks)),
+        ),
+    },
+)
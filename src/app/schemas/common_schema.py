@@ -9,6 +9,11 @@ class IMetaGeneral(BaseModel):
     roles: list[IRoleRead]
 
 
+class IDeleteCounts(BaseModel):
+    links: int = 0
+    tasks: int = 0
+
+
 class IOrderEnum(str, Enum):
     ascendent = "asc"
     descendent = "desc"
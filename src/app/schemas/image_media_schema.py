@@ -1,6 +1,7 @@
 from pydantic import model_validator
 
 from app.models.image_media_model import ImageMedia, ImageMediaBase
+from app.models.image_rendition_model import ImageRenditionBase
 from app.models.media_model import Media
 from app.schemas.media_schema import IMediaRead
 from app.utils.partial import optional
@@ -17,8 +18,13 @@ class IImageMediaUpdate(ImageMediaBase):
     pass
 
 
+class IImageRenditionRead(ImageRenditionBase):
+    media: IMediaRead | None
+
+
 class IImageMediaRead(ImageMediaBase):
     media: IMediaRead | None
+    renditions: list[IImageRenditionRead] | None = []
 
 
 class IImageMediaReadCombined(ImageMediaBase):
@@ -1,11 +1,19 @@
 from uuid import UUID
 
+from sqlmodel import SQLModel
+
 from app.models.project_model import ProjectBase
 from app.schemas.task_schema import ITaskRead
 from app.schemas.user_schema import IUserRead, IUserWithoutImage
 from app.utils.partial import optional
 
 
+class IProjectProgress(SQLModel):
+    tasks_total: int
+    tasks_done: int
+    percent_completed: float
+
+
 class IProjectCreate(ProjectBase):
     pass
 
@@ -16,18 +24,18 @@ class IProjectUpdate(ProjectBase):
     pass
 
 
-class IProjectRead(ProjectBase):
+class IProjectRead(ProjectBase, IProjectProgress):
     id: UUID
     created_by_id: UUID
 
 
-class IProjectWithUsers(ProjectBase):
+class IProjectWithUsers(ProjectBase, IProjectProgress):
     id: UUID
     created_by_id: UUID
     users: list[IUserWithoutImage] | None = []
 
 
-class IProjectWithUsersTasks(ProjectBase):
+class IProjectWithUsersTasks(ProjectBase, IProjectProgress):
     id: UUID
     created_by_id: UUID
     tasks: list[ITaskRead] | None = []
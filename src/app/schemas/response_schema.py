@@ -1,10 +1,12 @@
 from collections.abc import Sequence
+from functools import cache
 from math import ceil
 from typing import Any, Generic, TypeVar
 
 from fastapi_pagination import Page, Params
 from fastapi_pagination.bases import AbstractPage, AbstractParams
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+from starlette.responses import Response
 
 DataType = TypeVar("DataType")
 T = TypeVar("T")
@@ -16,6 +18,19 @@ class PageBase(Page[T], Generic[T]):
     next_page: int | None = Field(default=None, description="Page number of the next page")
 
 
+class CursorParams(BaseModel):
+    cursor: str | None = Field(default=None, description="Cursor returned by the previous page")
+    size: int = Field(default=50, ge=1, le=100, description="Page size")
+    with_total: bool = Field(default=False, description="Also count all items (slower)")
+
+
+class CursorPageBase(BaseModel, Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_cursor: str | None = Field(default=None, description="Cursor of the next page")
+    total: int | None = Field(default=None, description="Total items, only when requested")
+
+
 class IResponseBase(BaseModel, Generic[T]):
     message: str | None = ""
     meta: dict | Any | None = {}
@@ -54,6 +69,10 @@ class IGetResponsePaginated(AbstractPage[T], Generic[T]):
         )
 
 
+class IGetResponseCursorPaginated(IResponseBase[CursorPageBase[T]], Generic[T]):
+    message: str | None = "Data paginated correctly"
+
+
 class IGetResponseBase(IResponseBase[DataType], Generic[DataType]):
     message: str | None = "Data got correctly"
 
@@ -77,6 +96,7 @@ def create_response(
 ) -> (
     IResponseBase[DataType]
     | IGetResponsePaginated[DataType]
+    | IGetResponseCursorPaginated[DataType]
     | IGetResponseBase[DataType]
     | IPutResponseBase[DataType]
     | IDeleteResponseBase[DataType]
@@ -89,3 +109,31 @@ def create_response(
     if message is None:
         return {"data": data, "meta": meta}
     return {"data": data, "message": message, "meta": meta}
+
+
+@cache
+def get_response_adapter(response_type: Any) -> TypeAdapter:
+    """Building an adapter compiles its validator and serializer, it is done once per type."""
+    return TypeAdapter(response_type)
+
+
+def create_json_response(
+    response_type: Any,
+    data: DataType,
+    message: str | None = None,
+    meta: dict | Any | None = {},
+    status_code: int = 200,
+) -> Response:
+    """Fast path of `create_response` for endpoints returning large payloads.
+
+    The envelope is validated once against `response_type`, the return annotation of the
+    endpoint, and serialized straight to JSON bytes. FastAPI sends the returned response as is,
+    without validating and encoding the content again.
+    """
+    adapter = get_response_adapter(response_type)
+    content = adapter.validate_python(create_response(data, message, meta), from_attributes=True)
+    return Response(
+        content=adapter.dump_json(content, by_alias=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+
+
+class IDatabasePoolStats(BaseModel):
+    pool_class: str
+    size: int | None = None
+    max_overflow: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    wait_count: int | None = None
+    wait_time_total: float | None = None
+    wait_time_max: float | None = None
+    timeouts: int | None = None
+
+
+class IPasswordHasherStats(BaseModel):
+    workers: int
+    max_pending: int
+    in_flight: int
+    queue_depth: int
+    max_in_flight: int
+    completed: int
+    rejected: int
+    wait_time_total: float
+    wait_time_max: float
+    run_time_total: float
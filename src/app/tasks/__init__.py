@@ -1,2 +1,7 @@
-from app.tasks.email import send_verification_email
+from app.tasks.email import (
+    flush_verification_emails,
+    send_verification_email,
+    send_verification_emails,
+)
 from app.tasks.media import generate_avatar_thumbnail
+from app.tasks.project import reconcile_project_task_counters
@@ -1,34 +1,156 @@
+from collections.abc import Callable
+from typing import TypeVar
+
 import grpc
-from celery import shared_task
+from celery import Task, shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from google.protobuf.message import Message
 from loguru import logger
 
 from app.core.config import settings
-from app.generated.mail.mail_pb2 import SendEmailWithOTPCodeRequest
+from app.db.redis_pool import get_worker_redis_client
+from app.generated.mail.mail_pb2 import (
+    SendEmailsWithOTPCodeBatchRequest,
+    SendEmailWithOTPCodeRequest,
+)
 from app.generated.mail.mail_pb2_grpc import MailServiceStub
+from app.utils.mail_client import RETRYABLE_STATUS_CODES, get_mail_stub
+from app.utils.mail_queue import pop_pending_verification_emails, requeue_verification_emails
 
+ResponseT = TypeVar("ResponseT", bound=Message)
 
-@shared_task(name="send_verification_email")
-def send_verification_email(email_to: str, otp_code: int) -> None:
-    # Create a gRPC channel
-    channel = grpc.insecure_channel(f"{settings.mail.MAIL_HOST}:{settings.mail.MAIL_PORT}")
 
-    # Create a gRPC stub for the Mail service
-    stub = MailServiceStub(channel)
+class MailServiceUnavailable(Exception):
+    """The mail service could not be reached, the task is retried later."""
+
+
+class MailMethodUnimplemented(Exception):
+    """The mail service does not implement the called method."""
+
+
+mail_task_options = {
+    "autoretry_for": (MailServiceUnavailable,),
+    "max_retries": settings.mail.MAIL_TASK_MAX_RETRIES,
+    "retry_backoff": True,
+    "retry_backoff_max": settings.mail.MAIL_TASK_RETRY_BACKOFF_MAX_SECONDS,
+    "retry_jitter": True,
+}
+
+
+def call_mail_service(method: Callable[..., ResponseT], request: Message) -> ResponseT | None:
+    """Calls the mail service, UNAVAILABLE is retried by the channel.
+
+    Returns None when the call failed for good, raises MailMethodUnimplemented when the
+    service does not implement the method.
+    """
+    try:
+        return method(request, timeout=settings.mail.MAIL_RPC_TIMEOUT_SECONDS)
+    except grpc.RpcError as e:
+        if e.code() in RETRYABLE_STATUS_CODES:
+            logger.warning(f"Mail service unavailable, retrying later: '{e.code().name}'")
+            raise MailServiceUnavailable(e.details()) from e
+        if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+            raise MailMethodUnimplemented(e.details()) from e
+        logger.error(f"Not able to send email: '{e.code().name}: {e.details()}'")
+        return None
+
+
+@shared_task(name="send_verification_email", **mail_task_options)
+def send_verification_email(email_to: str, otp_code: int) -> None:
+    # Reuse a warm channel of the worker process
+    stub = get_mail_stub()
 
     # Prepare the request message
     request = SendEmailWithOTPCodeRequest(email=email_to, otp_code=str(otp_code))
 
+    # Call the SendConfirmationEmail RPC
+    response = call_mail_service(stub.SendConfirmationEmailOTPCode, request)
+    if response is None:
+        return
+
+    # Log success or failure
+    if response.success:
+        logger.info(f"Otp code has been successfully sent to e-mail: '{email_to}'")
+    else:
+        logger.error("Failed to send confirmation email.")
+
+
+def send_each_verification_email(
+    stub: MailServiceStub,
+    emails: list[dict[str, str]],
+) -> list[dict[str, str | bool]]:
+    """Sends the OTP emails with one call each, for a mail service without the batch method."""
+    results = []
+    for email in emails:
+        request = SendEmailWithOTPCodeRequest(email=email["email"], otp_code=email["otp_code"])
+        response = call_mail_service(stub.SendConfirmationEmailOTPCode, request)
+        results.append(
+            {
+                "email": email["email"],
+                "success": response is not None and response.success,
+                "message": response.message if response is not None else "",
+            },
+        )
+    return results
+
+
+@shared_task(name="send_verification_emails", **mail_task_options)
+def send_verification_emails(emails: list[dict[str, str]]) -> list[dict[str, str | bool]]:
+    """Sends a batch of OTP emails in one call and reports the result of every email."""
+    stub = get_mail_stub()
+    request = SendEmailsWithOTPCodeBatchRequest(
+        emails=[
+            SendEmailWithOTPCodeRequest(email=email["email"], otp_code=email["otp_code"])
+            for email in emails
+        ],
+    )
+
     try:
-        # Call the SendConfirmationEmail RPC
-        response = stub.SendConfirmationEmailOTPCode(request)
-
-        # Log success or failure
-        if response.success:
-            logger.info(f"Otp code has been successfully sent to e-mail: '{email_to}'")
-        else:
-            logger.error("Failed to send confirmation email.")
-    except Exception as e:
-        logger.error(f"Not able to send email: '{e}'")
-    finally:
-        # Close the gRPC channel
-        channel.close()
+        response = call_mail_service(stub.SendConfirmationEmailOTPCodeBatch, request)
+    except MailMethodUnimplemented:
+        logger.warning("Mail service without the batch method, sending the emails one by one")
+        results = send_each_verification_email(stub, emails)
+    else:
+        if response is None:
+            return [{"email": email["email"], "success": False, "message": ""} for email in emails]
+        results = [
+            {"email": result.email, "success": result.success, "message": result.message}
+            for result in response.results
+        ]
+    failed = [result for result in results if not result["success"]]
+    for result in failed:
+        logger.error(f"Failed to send otp code to e-mail '{result['email']}': {result['message']}")
+    logger.info(f"Otp codes have been sent to {len(results) - len(failed)}/{len(emails)} e-mails")
+    return results
+
+
+@shared_task(
+    bind=True,
+    name="flush_verification_emails",
+    max_retries=settings.mail.MAIL_TASK_MAX_RETRIES,
+)
+def flush_verification_emails(self: Task) -> int:
+    """Drains the queued OTP emails into batches, returns the number of batches."""
+    redis_client = get_worker_redis_client()
+    batches = 0
+    # Emails queued once the list is empty schedule the next flush themselves
+    while emails := pop_pending_verification_emails(
+        redis_client,
+        settings.mail.MAIL_BATCH_MAX_SIZE,
+    ):
+        try:
+            send_verification_emails.delay(emails)
+        except Exception as e:
+            # New emails do not schedule a flush while these are queued, the retry sends them
+            requeue_verification_emails(redis_client, emails)
+            raise self.retry(
+                exc=e,
+                countdown=get_exponential_backoff_interval(
+                    factor=1,
+                    retries=self.request.retries,
+                    maximum=settings.mail.MAIL_TASK_RETRY_BACKOFF_MAX_SECONDS,
+                    full_jitter=True,
+                ),
+            ) from e
+        batches += 1
+    return batches
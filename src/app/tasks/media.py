@@ -1,40 +1,72 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 from asyncer import runnify
 from celery import shared_task
+from loguru import logger
+from PIL import Image
 from sqlmodel import select
 
 from app.api import deps
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.image_media_model import ImageMedia
+from app.models.image_rendition_model import ImageRendition
 from app.models.media_model import Media
-from app.models.user_model import User
-from app.schemas.media_schema import IMediaCreate
-from app.utils.resize_image import IModifiedImageResponse, modify_image_resized
+from app.utils.minio_client import IMinioResponse, MinioClient
+from app.utils.resize_image import IImageRendition, create_renditions, image_extension
 
 
-async def add_image(user_id: str, file_name: str, image: IModifiedImageResponse) -> None:
-    async with SessionLocal() as db_session:
-        # Retrieve user by ID from the database
-        user = await db_session.execute(select(User).where(User.id == user_id))
-        user = user.scalar_one_or_none()
-
-        # Create a new image media object
-        media = IMediaCreate(title="", description="", path=file_name)
+async def add_renditions(
+    file_name: str,
+    renditions: list[tuple[IImageRendition, IMinioResponse]],
+) -> None:
+    """Records the renditions of the images stored at `file_name` in one transaction.
 
-        # Set user's image to the new image media object
-        user.image = ImageMedia(
-            media=Media.from_orm(media),
-            height=image.height,
-            width=image.width,
-            file_format=image.file_format,
+    Images uploaded with the same content while the renditions were created share them.
+    """
+    async with SessionLocal() as db_session:
+        response = await db_session.execute(
+            select(ImageMedia)
+            .join(Media, ImageMedia.media_id == Media.id)
+            .where(Media.path == file_name),
         )
+        images = response.scalars().all()
+        if not images:
+            logger.warning(f"Image '{file_name}' not found, renditions are not recorded")
+            return
 
-        # Add user to database session
-        db_session.add(user)
+        db_session.add_all(
+            [
+                ImageRendition(
+                    image_media_id=image.id,
+                    media=Media(title="", description="", path=data_file.file_name),
+                    size=rendition.size,
+                    file_format=rendition.file_format,
+                    width=rendition.width,
+                    height=rendition.height,
+                )
+                for image in images
+                for rendition, data_file in renditions
+            ],
+        )
         await db_session.commit()
-        await db_session.refresh(user)
+
+
+def upload_rendition(
+    minio_client: MinioClient,
+    file_name: str,
+    rendition: IImageRendition,
+) -> tuple[IImageRendition, IMinioResponse]:
+    file_name_split = os.path.splitext(file_name)
+    extension = image_extension(rendition.file_format)
+    data_file = minio_client.put_object(
+        file_name=f"{file_name_split[0]}-{rendition.size}{extension}",
+        file_data=BytesIO(rendition.file_data),
+        content_type=Image.MIME.get(rendition.file_format, "application/octet-stream"),
+    )
+    return rendition, data_file
 
 
 @shared_task(name="generate_avatar_thumbnail")
@@ -42,26 +74,29 @@ def generate_avatar_thumbnail(user_id: str, file_name: str) -> None:
     # Connect to Minio client
     minio_client = deps.minio_auth()
 
-    # Retrieve image data from Minio
-    image = minio_client.get_object(file_name=file_name)
-    image_bytes = BytesIO(image.read())
-
-    # Modify the image to generate a thumbnail
-    image_modified = modify_image_resized(image_bytes)
+    # Stream the original from Minio
+    file_data, _ = minio_client.download_object(file_name=file_name)
 
-    # Get the content type of the original image
-    content_type = image.getheader("content-type")
-
-    # Generate a new file name for the thumbnail
-    file_name_split = os.path.splitext(file_name)
-    file_name_thumbnail = f"{file_name_split[0]}-thumbnail{file_name_split[-1]}"
+    # Decode once and encode every size and format
+    with file_data:
+        renditions = create_renditions(
+            file_data,
+            sizes=settings.file_storage.IMAGE_RENDITION_SIZES,
+            formats=settings.file_storage.IMAGE_RENDITION_FORMATS,
+            quality=settings.file_storage.IMAGE_RENDITION_QUALITY,
+        )
 
-    # Upload the thumbnail to Minio and get its metadata
-    data_file = minio_client.put_object(
-        file_name=file_name_thumbnail,
-        file_data=BytesIO(image_modified.file_data),
-        content_type=content_type,
-    )
+    # Upload the renditions concurrently
+    with ThreadPoolExecutor(
+        max_workers=settings.file_storage.IMAGE_RENDITION_UPLOAD_WORKERS,
+    ) as executor:
+        uploaded = list(
+            executor.map(
+                lambda rendition: upload_rendition(minio_client, file_name, rendition),
+                renditions,
+            ),
+        )
 
     # Call assynchrony function
-    runnify(add_image)(user_id=user_id, file_name=data_file.file_name, image=image_modified)
+    runnify(add_renditions)(file_name=file_name, renditions=uploaded)
+    logger.info(f"Created {len(uploaded)} renditions of the image of user '{user_id}'")
@@ -0,0 +1,77 @@
+from asyncer import runnify
+from celery import shared_task
+from loguru import logger
+from sqlalchemy import or_, update
+from sqlmodel import func, select
+
+from app.db.redis_pool import get_worker_redis_client
+from app.db.session import SessionLocal
+from app.models.project_model import Project
+from app.models.task_model import Task
+from app.utils.project_stats import STATS_GENERATION_KEY, STATS_KEY
+from app.utils.response_cache import get_tag_key
+
+
+async def reconcile_task_counters(batch_size: int) -> int:
+    """Recounts the tasks of every project, returns the number of repaired projects."""
+    repaired = 0
+    last_id = None
+    async with SessionLocal() as db_session:
+        while True:
+            # Locking the projects first makes the counts see every task change whose
+            # trigger already ran, the others wait and apply their deltas on top
+            query = select(Project.id).order_by(Project.id).limit(batch_size).with_for_update()
+            if last_id is not None:
+                query = query.where(Project.id > last_id)
+            ids = (await db_session.execute(query)).scalars().all()
+            if not ids:
+                break
+
+            counts = (
+                select(
+                    Project.id,
+                    func.count(Task.id).label("tasks_total"),
+                    func.count(Task.id).filter(Task.done).label("tasks_done"),
+                )
+                .outerjoin(Task, Task.project_id == Project.id)
+                .where(Project.id.in_(ids))
+                .group_by(Project.id)
+                .subquery()
+            )
+            response = await db_session.execute(
+                update(Project)
+                .where(
+                    Project.id == counts.c.id,
+                    or_(
+                        Project.tasks_total != counts.c.tasks_total,
+                        Project.tasks_done != counts.c.tasks_done,
+                    ),
+                )
+                .values(tasks_total=counts.c.tasks_total, tasks_done=counts.c.tasks_done)
+                .returning(Project.id),
+            )
+            drifted = response.scalars().all()
+            await db_session.commit()
+
+            for project_id in drifted:
+                logger.warning(f"Repaired the task counters of project '{project_id}'")
+            repaired += len(drifted)
+            last_id = ids[-1]
+
+    return repaired
+
+
+@shared_task(name="reconcile_project_task_counters")
+def reconcile_project_task_counters(batch_size: int = 1000) -> int:
+    """Repairs the task counters of the projects if they drifted from their tasks."""
+    repaired = runnify(reconcile_task_counters)(batch_size=batch_size)
+    if repaired:
+        # The completion of the repaired projects changed
+        redis_client = get_worker_redis_client()
+        with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(get_tag_key(Project.__tablename__))
+            pipe.delete(STATS_KEY)
+            pipe.incr(STATS_GENERATION_KEY)
+            pipe.execute()
+    logger.info(f"Reconciled the task counters, {repaired} projects repaired")
+    return repaired
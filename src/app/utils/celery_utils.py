@@ -1,16 +1,54 @@
 from celery import current_app as current_celery_app
 from celery.result import AsyncResult
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 
 from app.core.config import settings
+from app.db.session import EngineRole, configure_engine
+from app.utils.mail_client import close_mail_channel_pool, init_mail_channel_pool
 
 
 def create_celery():
     celery_app = current_celery_app
     celery_app.config_from_object(settings, namespace="CELERY")
 
+    beat_schedule = {}
+    reconcile_interval = settings.celery.PROJECT_COUNTERS_RECONCILE_INTERVAL_SECONDS
+    if reconcile_interval:
+        beat_schedule["reconcile-project-task-counters"] = {
+            "task": "reconcile_project_task_counters",
+            "schedule": reconcile_interval,
+        }
+    sweep_interval = settings.mail.MAIL_BATCH_SWEEP_INTERVAL_SECONDS
+    if sweep_interval:
+        beat_schedule["flush-verification-emails"] = {
+            "task": "flush_verification_emails",
+            "schedule": sweep_interval,
+            # A later sweep sends the same emails
+            "options": {"expires": sweep_interval},
+        }
+    celery_app.conf.beat_schedule = beat_schedule
+
     return celery_app
 
 
+@worker_init.connect
+@worker_process_init.connect
+def init_worker_engine(**kwargs) -> None:
+    """Switches the database engine of a worker process to the worker role."""
+    configure_engine(EngineRole.worker)
+
+
+@worker_process_init.connect
+def init_worker_mail_channels(**kwargs) -> None:
+    """Opens the channels to the mail service once per worker process."""
+    init_mail_channel_pool()
+
+
+@worker_process_shutdown.connect
+def close_worker_mail_channels(**kwargs) -> None:
+    close_mail_channel_pool()
+
+
 def get_task_info(task_id):
     """
     Return task info according to the task_id.
@@ -0,0 +1,48 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from app.utils.exceptions import InvalidCursorException
+
+
+def _dump_value(value: Any) -> list[str]:
+    if isinstance(value, datetime):
+        return ["datetime", value.isoformat()]
+    if isinstance(value, UUID):
+        return ["uuid", str(value)]
+    if isinstance(value, int):
+        return ["int", str(value)]
+    return ["str", str(value)]
+
+
+def _load_value(kind: str, value: str) -> Any:
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "uuid":
+        return UUID(value)
+    if kind == "int":
+        return int(value)
+    if kind == "str":
+        return value
+    raise ValueError(f"unknown cursor value kind {kind}")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encodes the keyset values of the last item of a page into an opaque cursor."""
+    raw = json.dumps([_dump_value(value) for value in values], separators=(",", ":"))
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Decodes a cursor back into `size` keyset values."""
+    try:
+        raw = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != size:
+            raise ValueError("cursor does not match the keyset")
+        return [_load_value(kind, value) for kind, value in raw]
+    except (BinasciiError, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidCursorException(cursor=cursor)
@@ -1,6 +1,8 @@
+from .auth_exception import PasswordHasherBusyException
 from .common_exception import (
     ContentNoChangeException,
     IdNotFoundException,
+    InvalidCursorException,
     NameExistException,
     NameNotFoundException,
 )
@@ -9,4 +11,5 @@ from .project_exception import (
     UserNotCreatorProject,
     UserNotMemberProject,
 )
+from .upload_exception import FileTooLargeException, UploadsBusyException
 from .user_exceptions import EmailNotFoundException, UserSelfDeleteException
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+class PasswordHasherBusyException(HTTPException):
+    def __init__(
+        self,
+        retry_after: int = 1,
+        headers: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests in progress, please retry later.",
+            headers={"Retry-After": str(retry_after), **(headers or {})},
+        )
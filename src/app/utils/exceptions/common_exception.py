@@ -79,3 +79,16 @@ class NameExistException(HTTPException, Generic[ModelType]):
             detail=f"The {model.__name__} name already exists.",
             headers=headers,
         )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(
+        self,
+        cursor: str | None = None,
+        headers: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The pagination cursor {cursor} is not valid.",
+            headers=headers,
+        )
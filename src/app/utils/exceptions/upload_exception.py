@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+class FileTooLargeException(HTTPException):
+    def __init__(
+        self,
+        max_size: int,
+        headers: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"The file exceeds the maximum size of {max_size} bytes.",
+            headers=headers,
+        )
+
+
+class UploadsBusyException(HTTPException):
+    def __init__(
+        self,
+        retry_after: int = 1,
+        headers: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many uploads in progress, please retry later.",
+            headers={"Retry-After": str(retry_after), **(headers or {})},
+        )
@@ -0,0 +1,119 @@
+import json
+from itertools import cycle
+from threading import Lock
+
+import grpc
+from loguru import logger
+
+from app.core.config import settings
+from app.generated.mail.mail_pb2_grpc import MailServiceStub
+
+# Status codes the task retries with backoff once the channel gave up on them
+RETRYABLE_STATUS_CODES = frozenset(
+    {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    },
+)
+
+
+def get_service_config() -> str:
+    """Lets the channel itself retry calls while the mail service is UNAVAILABLE."""
+    return json.dumps(
+        {
+            "methodConfig": [
+                {
+                    "name": [{"service": "mail.v1.MailService"}],
+                    "retryPolicy": {
+                        "maxAttempts": settings.mail.MAIL_RPC_MAX_ATTEMPTS,
+                        "initialBackoff": "0.1s",
+                        "maxBackoff": "2s",
+                        "backoffMultiplier": 2,
+                        "retryableStatusCodes": ["UNAVAILABLE"],
+                    },
+                },
+            ],
+        },
+    )
+
+
+def get_channel_options() -> list[tuple[str, int | str]]:
+    return [
+        ("grpc.keepalive_time_ms", settings.mail.MAIL_KEEPALIVE_TIME_SECONDS * 1000),
+        ("grpc.keepalive_timeout_ms", settings.mail.MAIL_KEEPALIVE_TIMEOUT_SECONDS * 1000),
+        # Otherwise channels with the same target share one connection
+        ("grpc.use_local_subchannel_pool", 1),
+        ("grpc.enable_retries", 1),
+        ("grpc.service_config", get_service_config()),
+    ]
+
+
+class MailChannelPool:
+    """Channels to the mail service opened once per worker process and reused by every task.
+
+    A channel reconnects by itself, so calls only pay the TCP and HTTP/2 handshake after the
+    connection was lost.
+    """
+
+    def __init__(self, target: str, size: int) -> None:
+        self.target = target
+        self.channels = [
+            grpc.insecure_channel(target, options=get_channel_options())
+            for _ in range(max(size, 1))
+        ]
+        self.stubs = cycle([MailServiceStub(channel) for channel in self.channels])
+        self.lock = Lock()
+
+    def get_stub(self) -> MailServiceStub:
+        with self.lock:
+            return next(self.stubs)
+
+    def close(self) -> None:
+        for channel in self.channels:
+            channel.close()
+
+
+_pool: MailChannelPool | None = None
+_pool_lock = Lock()
+
+
+def _open_pool() -> MailChannelPool:
+    pool = MailChannelPool(
+        target=f"{settings.mail.MAIL_HOST}:{settings.mail.MAIL_PORT}",
+        size=settings.mail.MAIL_CHANNEL_POOL_SIZE,
+    )
+    logger.info(f"Opened {len(pool.channels)} channels to the mail service")
+    return pool
+
+
+def init_mail_channel_pool() -> None:
+    """Opens the channels of a new worker process.
+
+    Channels inherited from the parent process are left alone, gRPC can not use them after
+    a fork.
+    """
+    global _pool
+
+    with _pool_lock:
+        _pool = _open_pool()
+
+
+def get_mail_stub() -> MailServiceStub:
+    """Returns a stub of the pool, opening it first outside a prefork worker process."""
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _open_pool()
+    return _pool.get_stub()
+
+
+def close_mail_channel_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
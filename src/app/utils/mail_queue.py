@@ -0,0 +1,42 @@
+import json
+
+from celery import current_app
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+PENDING_OTP_EMAILS_KEY = "mail:otp:pending"
+
+
+async def enqueue_verification_email(redis_client: Redis, email_to: str, otp_code: str) -> None:
+    """Queues an OTP email to be sent in a batch.
+
+    The first email of a window schedules the flush, a full batch schedules it right away.
+    Emails whose flush was lost are sent by the periodic sweep.
+    """
+    pending = await redis_client.rpush(
+        PENDING_OTP_EMAILS_KEY,
+        json.dumps({"email": email_to, "otp_code": str(otp_code)}),
+    )
+    if pending == 1:
+        current_app.send_task(
+            "flush_verification_emails",
+            countdown=settings.mail.MAIL_BATCH_WINDOW_SECONDS,
+        )
+    elif pending % settings.mail.MAIL_BATCH_MAX_SIZE == 0:
+        current_app.send_task("flush_verification_emails")
+
+
+def pop_pending_verification_emails(redis_client: SyncRedis, count: int) -> list[dict[str, str]]:
+    """Takes up to `count` queued OTP emails, oldest first."""
+    with redis_client.pipeline(transaction=True) as pipe:
+        pipe.lrange(PENDING_OTP_EMAILS_KEY, 0, count - 1)
+        pipe.ltrim(PENDING_OTP_EMAILS_KEY, count, -1)
+        items, _ = pipe.execute()
+    return [json.loads(item) for item in items]
+
+
+def requeue_verification_emails(redis_client: SyncRedis, emails: list[dict[str, str]]) -> None:
+    """Puts emails taken by `pop_pending_verification_emails` back at the head of the queue."""
+    redis_client.lpush(PENDING_OTP_EMAILS_KEY, *[json.dumps(email) for email in reversed(emails)])
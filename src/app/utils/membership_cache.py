@@ -0,0 +1,62 @@
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.db.redis_pool import get_redis_pool
+from app.utils.ttl_cache import TTLCache
+from app.utils.two_tier_cache import local_caches, publish_invalidation
+
+# (user_id, project_id) -> (project exists, user is a member)
+membership_cache: TTLCache[tuple[str, str], tuple[bool, bool]] = TTLCache(
+    maxsize=settings.srv.MEMBERSHIP_CACHE_MAX_SIZE,
+    ttl=settings.srv.MEMBERSHIP_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_membership(user_id: UUID | str, project_id: UUID | str) -> tuple[bool, bool] | None:
+    return membership_cache.get((str(user_id), str(project_id)))
+
+
+def cache_membership(
+    user_id: UUID | str,
+    project_id: UUID | str,
+    membership: tuple[bool, bool],
+) -> None:
+    membership_cache.set((str(user_id), str(project_id)), membership)
+
+
+def drop_membership(key: str | None) -> None:
+    """Drops the memberships matching a `user_id:project_id` key in this process, all if None.
+
+    An empty id in the key matches any user or project.
+    """
+    if key is None:
+        membership_cache.clear()
+        return
+
+    user_id, _, project_id = key.partition(":")
+    membership_cache.delete_where(
+        lambda cached_key: (
+            (not user_id or cached_key[0] == user_id)
+            and (not project_id or cached_key[1] == project_id)
+        ),
+    )
+
+
+local_caches["membership"] = drop_membership
+
+
+async def invalidate_membership(
+    *,
+    user_id: UUID | str | None = None,
+    project_id: UUID | str | None = None,
+) -> None:
+    """Drop the cached memberships of a user, a project or both when links change.
+
+    The other workers drop theirs on the published message, a revoked membership stays
+    cached there at most MEMBERSHIP_CACHE_TTL_SECONDS if the message is missed.
+    """
+    key = f"{user_id or ''}:{project_id or ''}"
+    drop_membership(key)
+    await publish_invalidation(Redis(connection_pool=get_redis_pool()), "membership", key)
@@ -2,11 +2,14 @@
 
 from datetime import timedelta
 from io import BytesIO
-from typing import Any
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any
 
 from minio import Minio
 from pydantic import BaseModel
 
+from app.utils.ttl_cache import TTLCache
+
 
 class IMinioResponse(BaseModel):
     bucket_name: str
@@ -15,11 +18,26 @@ class IMinioResponse(BaseModel):
 
 
 class MinioClient:
-    def __init__(self, minio_url: str, access_key: str, secret_key: str, bucket_name: str) -> None:
+    def __init__(
+        self,
+        minio_url: str,
+        access_key: str,
+        secret_key: str,
+        bucket_name: str,
+        url_expires: timedelta = timedelta(days=7),
+        url_cache_ttl: float = 0,
+        url_cache_size: int = 0,
+    ) -> None:
         self.minio_url = minio_url
         self.access_key = access_key
         self.secret_key = secret_key
         self.bucket_name = bucket_name
+        self.url_expires = url_expires
+        # (bucket_name, object_name) -> presigned URL, entries expire long before the signature
+        self.url_cache: TTLCache[tuple[str, str], str] = TTLCache(
+            maxsize=url_cache_size,
+            ttl=url_cache_ttl,
+        )
         self.client = Minio(
             self.minio_url,
             access_key=self.access_key,
@@ -34,12 +52,16 @@ class MinioClient:
         return self.bucket_name
 
     def presigned_get_object(self, bucket_name: str, object_name: str) -> Any:
-        # Request URL expired after 7 days
+        if url := self.url_cache.get((bucket_name, object_name)):
+            return url
+
+        # Request URL expired after `url_expires`, 7 days by default
         url = self.client.presigned_get_object(
             bucket_name=bucket_name,
             object_name=object_name,
-            expires=timedelta(days=7),
+            expires=self.url_expires,
         )
+        self.url_cache.set((bucket_name, object_name), url)
         return url
 
     def check_file_name_exists(self, bucket_name: str, file_name: str) -> bool:
@@ -77,6 +99,23 @@ class MinioClient:
         except Exception as e:
             raise e
 
+    def download_object(
+        self,
+        file_name: str,
+        chunk_size: int = 1024 * 1024,
+    ) -> tuple[IO[bytes], str | None]:
+        """Streams the object into a spooled temporary file, large objects spill to disk."""
+        response = self.client.get_object(bucket_name=self.bucket_name, object_name=file_name)
+        try:
+            file_data = SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+            for chunk in response.stream(chunk_size):
+                file_data.write(chunk)
+            file_data.seek(0)
+            return file_data, response.headers.get("content-type")
+        finally:
+            response.close()
+            response.release_conn()
+
     def get_object(self, file_name: str) -> Any:
         try:
             object = self.client.get_object(
@@ -3,30 +3,59 @@ from uuid import UUID
 
 from redis.asyncio import Redis
 
-from app.models.user_model import User
+from app.utils.token import TokenGrant, get_legacy_token_key, get_token_key
 
+# Consumes the OTP code ARGV[1] of the set KEYS[1] and makes the reset token ARGV[2] (expiring
+# at ARGV[3]) the only one of the set KEYS[2], a code can not be redeemed twice. KEYS[3] is the
+# legacy set of the reset tokens
+REDEEM_OTP_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[2])
+redis.call('EXPIREAT', KEYS[2], ARGV[3])
+return 1
+"""
 
-async def add_otp_to_redis(
+
+def get_otp_key(user_id: UUID | str) -> str:
+    return f"user:{user_id}:otp"
+
+
+async def replace_otp(
     redis_client: Redis,
-    user: User,
+    user_id: UUID | str,
     otp_code: str,
-    expire_time: int | None = None,
+    expire_time: int,
 ) -> None:
-    otp_key = f"user:{user.id}:otp"
-    valid_otps = await get_valid_otp(redis_client, user.id)
-    await redis_client.sadd(otp_key, otp_code)
-    if not valid_otps:
-        await redis_client.expire(otp_key, timedelta(minutes=expire_time))
-
+    """Makes `otp_code` the only valid code of the user in one transaction."""
+    otp_key = get_otp_key(user_id)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(otp_key)
+        pipe.sadd(otp_key, otp_code)
+        pipe.expire(otp_key, timedelta(minutes=expire_time))
+        await pipe.execute()
 
-async def get_valid_otp(redis_client: Redis, user_id: UUID) -> set:
-    otp_key = f"user:{user_id}:otp"
-    valid_otps = await redis_client.smembers(otp_key)
-    return valid_otps
 
-
-async def delete_otps(redis_client: Redis, user: User) -> None:
-    token_key = f"user:{user.id}:otp"
-    valid_otps = await redis_client.smembers(token_key)
-    if valid_otps is not None:
-        await redis_client.delete(token_key)
+async def redeem_otp(
+    redis_client: Redis,
+    user_id: UUID | str,
+    otp_code: str,
+    reset_grant: TokenGrant,
+) -> bool:
+    """Exchanges a valid OTP code for the reset token in a single round trip."""
+    script = redis_client.register_script(REDEEM_OTP_SCRIPT)
+    is_valid = await script(
+        keys=[
+            get_otp_key(user_id),
+            get_token_key(user_id, reset_grant.token_type),
+            get_legacy_token_key(user_id, reset_grant.token_type),
+        ],
+        args=[otp_code, reset_grant.token_id, reset_grant.expires_at],
+    )
+    return bool(is_valid)
+
+
+async def delete_otps(redis_client: Redis, user_id: UUID | str) -> None:
+    await redis_client.delete(get_otp_key(user_id))
@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+from typing import Any, TypeVar
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+from app.utils.exceptions import PasswordHasherBusyException
+
+R = TypeVar("R")
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated pool so a login burst can not block the event loop.
+
+    bcrypt releases the GIL, so threads hash in parallel. Once `max_pending` calls are queued
+    or running, new ones are rejected with a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.run_time_total = 0.0
+
+    async def _run(self, func: partial[R]) -> R:
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusyException()
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        submitted = perf_counter()
+
+        def timed() -> tuple[R, float, float]:
+            started = perf_counter()
+            return func(), started, perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self.executor, timed)
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.wait_time_total += started - submitted
+        self.wait_time_max = max(self.wait_time_max, started - submitted)
+        self.run_time_total += finished - started
+        return result
+
+    async def hash(self, password: str | bytes) -> str:
+        return await self._run(partial(get_password_hash, password))
+
+    async def verify(self, password: str | bytes, hashed_password: str | bytes) -> bool:
+        return await self._run(partial(verify_password, password, hashed_password))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "max_in_flight": self.max_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_max": self.wait_time_max,
+            "run_time_total": self.run_time_total,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.srv.PASSWORD_HASH_WORKERS,
+    max_pending=settings.srv.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,50 @@
+from hashlib import sha256
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.db.redis_pool import get_redis_pool
+from app.models.user_model import User
+from app.utils.ttl_cache import TTLCache
+from app.utils.two_tier_cache import local_caches, publish_invalidation
+
+# (user_id, sha256(access_token)) -> authenticated user
+principal_cache: TTLCache[tuple[str, str], User] = TTLCache(
+    maxsize=settings.srv.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.srv.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def _principal_key(user_id: UUID | str, access_token: str) -> tuple[str, str]:
+    return str(user_id), sha256(access_token.encode()).hexdigest()
+
+
+def get_cached_principal(user_id: UUID | str, access_token: str) -> User | None:
+    return principal_cache.get(_principal_key(user_id, access_token))
+
+
+def cache_principal(user_id: UUID | str, access_token: str, user: User) -> None:
+    principal_cache.set(_principal_key(user_id, access_token), user)
+
+
+def drop_principal(user_id: str | None) -> None:
+    """Drops the cached sessions of the user in this process, of every user if None."""
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.delete_where(lambda key: key[0] == user_id)
+
+
+local_caches["principal"] = drop_principal
+
+
+async def invalidate_principal(user_id: UUID | str) -> None:
+    """Drop every cached session of the user in every process, call it when the user changes.
+
+    Sessions cached by the other workers are dropped when they receive the message, their
+    TTL bounds the staleness if it is missed.
+    """
+    user_id = str(user_id)
+    drop_principal(user_id)
+    await publish_invalidation(Redis(connection_pool=get_redis_pool()), "principal", user_id)
@@ -0,0 +1,99 @@
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.schemas.statistics_schema import StatisticsRead
+
+STATS_KEY = "project:stats"
+STATS_GENERATION_KEY = "project:stats:generation"
+
+# Returns the current generation with the snapshot in one call
+GET_SCRIPT = """
+return {redis.call('GET', KEYS[2]) or '0', redis.call('HGETALL', KEYS[1])}
+"""
+
+# Saves the snapshot only when nothing changed since its generation was read, otherwise the
+# totals counted before the change would overwrite the deltas applied after it
+SAVE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# Applies the deltas only when the snapshot exists, a partial hash must never be created. The
+# generation is bumped in both cases, so a snapshot being recomputed can not be saved over them
+APPLY_DELTAS_SCRIPT = """
+redis.call('INCR', KEYS[2])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    for i = 1, #ARGV, 2 do
+        redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+    return 1
+end
+return 0
+"""
+
+
+def get_stats_bucket(percent_completed: float) -> str:
+    if percent_completed == 0:
+        return "missing_count"
+    if percent_completed == 1:
+        return "completed_count"
+    return "ongoing_count"
+
+
+async def get_or_load_stats(
+    redis_client: Redis,
+    loader: Callable[[], Awaitable[StatisticsRead]],
+) -> StatisticsRead:
+    """Returns the snapshot, or the result of `loader` saved unless the stats changed meanwhile."""
+    if not settings.srv.PROJECT_STATS_SNAPSHOT_TTL_SECONDS:
+        return await loader()
+
+    script = redis_client.register_script(GET_SCRIPT)
+    generation, values = await script(keys=[STATS_KEY, STATS_GENERATION_KEY])
+    if values:
+        return StatisticsRead(**dict(zip(values[::2], values[1::2], strict=True)))
+
+    stats = await loader()
+    args = [item for field_value in stats.model_dump().items() for item in field_value]
+    script = redis_client.register_script(SAVE_SCRIPT)
+    await script(
+        keys=[STATS_KEY, STATS_GENERATION_KEY],
+        args=[generation, settings.srv.PROJECT_STATS_SNAPSHOT_TTL_SECONDS, *args],
+    )
+    return stats
+
+
+async def update_stats_snapshot(redis_client: Redis, deltas: dict[str, int]) -> None:
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    args = [item for field_delta in deltas.items() for item in field_delta]
+    script = redis_client.register_script(APPLY_DELTAS_SCRIPT)
+    await script(keys=[STATS_KEY, STATS_GENERATION_KEY], args=args)
+
+
+async def add_project_to_stats(redis_client: Redis, percent_completed: float) -> None:
+    bucket = get_stats_bucket(percent_completed)
+    await update_stats_snapshot(redis_client, {"projects_count": 1, bucket: 1})
+
+
+async def remove_project_from_stats(redis_client: Redis, percent_completed: float) -> None:
+    bucket = get_stats_bucket(percent_completed)
+    await update_stats_snapshot(redis_client, {"projects_count": -1, bucket: -1})
+
+
+async def invalidate_stats_snapshot(redis_client: Redis) -> None:
+    """Drops the snapshot when project completion changes outside of the API (task triggers)."""
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(STATS_KEY)
+        pipe.incr(STATS_GENERATION_KEY)
+        await pipe.execute()
@@ -0,0 +1,216 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from functools import cache
+from types import SimpleNamespace, UnionType
+from typing import Any, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import MANYTOONE, ONETOMANY, RelationshipProperty, aliased
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select
+
+# Labels of nested columns are the path of their field, e.g. `image__media__path`
+SEPARATOR = "__"
+PARENT_KEY = "__parent_id"
+
+
+def _unwrap(annotation: Any) -> tuple[Any, bool]:
+    """Returns the type of a field without `None` and whether it is a list of it."""
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+    if get_origin(annotation) in (list, Sequence):
+        return get_args(annotation)[0], True
+    return annotation, False
+
+
+def _is_schema(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+class _Node:
+    """One model of a projection, the root or a many-to-one relationship joined to it."""
+
+    def __init__(self, projection: "Projection", model: type[SQLModel], entity: Any, path: str):
+        self.projection = projection
+        self.model = model
+        self.entity = entity
+        self.path = path
+        self.mapper = inspect(model)
+        self.columns: dict[str, str] = {}  # field -> label
+        self.related: dict[str, tuple[_Node, type[BaseModel]]] = {}
+        self.flattened: dict[str, str] = {}  # `<relationship>_<column>` field -> label
+        self.computed: list[str] = []
+        self.collections: dict[str, tuple[Projection, str]] = {}  # field -> (child, key)
+        self.joined: dict[str, _Node] = {}
+        self.primary_key = self.add_column(self.mapper.primary_key[0].key)
+
+    def label(self, key: str) -> str:
+        return f"{self.path}{SEPARATOR}{key}" if self.path else key
+
+    def add_column(self, key: str) -> str:
+        label = self.label(key)
+        if label not in self.projection.labels:
+            self.projection.labels[label] = getattr(self.entity, key).label(label)
+        return label
+
+    def join(self, name: str) -> "_Node":
+        """Outer joins a many-to-one relationship once, whatever the fields using it."""
+        if name not in self.joined:
+            relationship = self.mapper.relationships[name]
+            target = relationship.mapper.class_
+            alias = aliased(target)
+            self.projection.joins.append(getattr(self.entity, name).of_type(alias))
+            self.joined[name] = _Node(self.projection, target, alias, self.label(name))
+        return self.joined[name]
+
+    def add_schema(self, schema: type[BaseModel]) -> None:
+        relationships = self.mapper.relationships
+        for name, field in schema.model_fields.items():
+            annotation, is_list = _unwrap(field.annotation)
+
+            if name in self.mapper.columns and not is_list:
+                self.columns[name] = self.add_column(name)
+            elif name in relationships:
+                self.add_relationship(name, relationships[name], annotation, is_list)
+            elif name in self.model.model_computed_fields:
+                # The property may read any column of the model
+                for key in self.mapper.columns.keys():
+                    self.add_column(key)
+                self.computed.append(name)
+            elif flattened := self.find_flattened(name):
+                relationship_name, key = flattened
+                self.flattened[name] = self.join(relationship_name).add_column(key)
+            elif field.is_required():
+                raise ValueError(
+                    f"Field '{name}' of {schema.__name__} can not be projected from "
+                    f"{self.model.__name__}",
+                )
+
+    def add_relationship(
+        self,
+        name: str,
+        relationship: RelationshipProperty,
+        annotation: Any,
+        is_list: bool,
+    ) -> None:
+        if not _is_schema(annotation):
+            raise ValueError(f"Relationship '{name}' must be read with a schema")
+
+        if relationship.direction is MANYTOONE and not is_list:
+            node = self.join(name)
+            node.add_schema(annotation)
+            self.related[name] = (node, annotation)
+        elif relationship.direction is ONETOMANY and is_list:
+            # Loaded by a second query, a join would repeat the parent rows
+            ((_, remote),) = relationship.local_remote_pairs
+            child = Projection(relationship.mapper.class_, annotation)
+            child.order_by = list(relationship.order_by or ())
+            child.parent_key = remote
+            self.collections[name] = (child, self.primary_key)
+        else:
+            raise ValueError(f"Relationship '{name}' of {self.model.__name__} is not supported")
+
+    def find_flattened(self, name: str) -> tuple[str, str] | None:
+        for relationship in self.mapper.relationships:
+            prefix = f"{relationship.key}_"
+            if relationship.direction is MANYTOONE and name.startswith(prefix):
+                key = name.removeprefix(prefix)
+                if key in relationship.mapper.columns:
+                    return relationship.key, key
+        return None
+
+    def to_dict(self, row: Any, collections: dict[str, dict[Any, list[Any]]]) -> dict | None:
+        if row[self.primary_key] is None:
+            # The outer join found no row
+            return None
+
+        values = {name: row[label] for name, label in self.columns.items()}
+        values.update({name: row[label] for name, label in self.flattened.items()})
+        if self.computed:
+            instance = SimpleNamespace(
+                **{key: row[self.label(key)] for key in self.mapper.columns.keys()},
+            )
+            for name in self.computed:
+                values[name] = self.model.model_computed_fields[name].wrapped_property.fget(
+                    instance,
+                )
+        for name, (node, _) in self.related.items():
+            values[name] = node.to_dict(row, collections)
+        for name, (_, key) in self.collections.items():
+            values[name] = collections[f"{self.path}{SEPARATOR}{name}"].get(row[key], [])
+        return values
+
+    def iter_collections(self) -> Any:
+        for name, (child, key) in self.collections.items():
+            yield f"{self.path}{SEPARATOR}{name}", child, key
+        for node, _ in self.related.values():
+            yield from node.iter_collections()
+
+
+class Projection:
+    """Selects only the columns a read schema needs and builds the schema from the rows.
+
+    Schema fields are resolved against the model in this order: columns, many-to-one
+    relationships (LEFT OUTER JOIN), one-to-many relationships (one more query for the whole
+    page), pydantic computed fields of the model (evaluated on the selected columns) and
+    `<relationship>_<column>` of a many-to-one relationship, e.g. `project_name`. Other fields
+    keep their default, required ones raise ValueError.
+    """
+
+    def __init__(self, model: type[SQLModel], schema: type[BaseModel]):
+        self.model = model
+        self.schema = schema
+        self.labels: dict[str, ColumnElement] = {}
+        self.joins: list[Any] = []
+        self.order_by: list[ColumnElement] = []
+        self.parent_key: ColumnElement | None = None
+        self.root = _Node(self, model, model, "")
+        self.root.add_schema(schema)
+
+    def select(self, *columns: Any) -> Select:
+        """The projected select, `columns` of the model are added for keysets or ordering."""
+        extra = [column.label(column.key) for column in columns if column.key not in self.labels]
+        query = select(*self.labels.values(), *extra).select_from(self.model)
+        for join in self.joins:
+            query = query.outerjoin(join)
+        return query
+
+    async def load_collections(
+        self,
+        db_session: AsyncSession,
+        rows: Sequence[Any],
+    ) -> dict[str, dict[Any, list[Any]]]:
+        collections: dict[str, dict[Any, list[Any]]] = {}
+        for path, child, key in self.root.iter_collections():
+            parent_ids = {row[key] for row in rows if row[key] is not None}
+            items: dict[Any, list[Any]] = defaultdict(list)
+            if parent_ids:
+                query = (
+                    child.select()
+                    .add_columns(child.parent_key.label(PARENT_KEY))
+                    .where(child.parent_key.in_(parent_ids))
+                    .order_by(*child.order_by)
+                )
+                child_rows = (await db_session.execute(query)).mappings().all()
+                children = await child.hydrate(db_session, child_rows)
+                for child_row, item in zip(child_rows, children, strict=True):
+                    items[child_row[PARENT_KEY]].append(item)
+            collections[path] = items
+        return collections
+
+    async def hydrate(self, db_session: AsyncSession, rows: Sequence[Any]) -> list[BaseModel]:
+        """Builds the schema from every row of the projected select."""
+        rows = [row._mapping if hasattr(row, "_mapping") else row for row in rows]
+        collections = await self.load_collections(db_session, rows)
+        return [self.schema.model_validate(self.root.to_dict(row, collections)) for row in rows]
+
+
+@cache
+def get_projection(model: type[SQLModel], schema: type[BaseModel]) -> Projection:
+    """Building a projection inspects the model and the schema, it is done once per pair."""
+    return Projection(model, schema)
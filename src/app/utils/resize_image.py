@@ -1,7 +1,8 @@
+from collections.abc import Sequence
 from io import BytesIO
-from typing import Any
+from typing import IO, Any
 
-from PIL import Image
+from PIL import Image, ImageOps
 from pydantic import BaseModel
 
 
@@ -12,6 +13,10 @@ class IModifiedImageResponse(BaseModel):
     file_data: Any = None
 
 
+class IImageRendition(IModifiedImageResponse):
+    size: int
+
+
 def crop_center(pil_img, crop_width, crop_height) -> Any:
     img_width, img_height = pil_img.size
     return pil_img.crop(
@@ -28,37 +33,92 @@ def crop_max_square(pil_img) -> Any:
     return crop_center(pil_img, min(pil_img.size), min(pil_img.size))
 
 
-def modify_image(image: BytesIO) -> IModifiedImageResponse:
-    pil_image = Image.open(image)
-    file_format = pil_image.format
-
-    in_mem_file = BytesIO()
-
-    # format here would be something like "JPEG". See below link for more info.
-    pil_image.save(in_mem_file, format=file_format)
+def probe_image(image_data: bytes) -> IModifiedImageResponse:
+    """Reads only the image header, the original bytes are passed through unchanged."""
+    with Image.open(BytesIO(image_data)) as pil_image:
+        return IModifiedImageResponse(
+            width=pil_image.width,
+            height=pil_image.height,
+            file_format=pil_image.format,
+            file_data=image_data,
+        )
+
+
+def sanitize_image(
+    image_data: bytes,
+    max_dimension: int,
+    quality: int = 90,
+) -> IModifiedImageResponse:
+    """Re-encodes the image without its metadata (EXIF, GPS...) and within `max_dimension`."""
+    with Image.open(BytesIO(image_data)) as pil_image:
+        file_format = pil_image.format
+
+        # The orientation is applied to the pixels before the EXIF data is dropped
+        sanitized = ImageOps.exif_transpose(pil_image)
+        if max(sanitized.size) > max_dimension:
+            sanitized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        # Only the color profile is kept
+        in_mem_file = BytesIO()
+        sanitized.save(
+            in_mem_file,
+            format=file_format,
+            quality=quality,
+            icc_profile=pil_image.info.get("icc_profile"),
+        )
 
     return IModifiedImageResponse(
-        width=pil_image.width,
-        height=pil_image.height,
+        width=sanitized.width,
+        height=sanitized.height,
         file_format=file_format,
         file_data=in_mem_file.getvalue(),
     )
 
 
-def modify_image_resized(image: BytesIO) -> IModifiedImageResponse:
-    size = (256, 256)
+def image_extension(file_format: str) -> str:
+    return ".jpg" if file_format == "JPEG" else f".{file_format.lower()}"
 
-    pil_image = Image.open(image)
-    file_format = pil_image.format
-    pil_image = crop_max_square(pil_image).resize(size, Image.Resampling.LANCZOS)
-    in_mem_file = BytesIO()
 
-    # format here would be something like "JPEG". See below link for more info.
-    pil_image.save(in_mem_file, format=file_format)
+def create_renditions(
+    image: IO[bytes],
+    sizes: Sequence[int],
+    formats: Sequence[str],
+    quality: int = 85,
+) -> list[IImageRendition]:
+    """Decodes the image once and encodes a square rendition per size and format.
 
-    return IModifiedImageResponse(
-        width=pil_image.width,
-        height=pil_image.height,
-        file_format=file_format,
-        file_data=in_mem_file.getvalue(),
-    )
+    The original format is always included. The JPEG decoder is asked to scale down
+    while decoding (draft) to the smallest size that still covers the largest rendition,
+    every smaller rendition is then resized from the previous one.
+    """
+    pil_image = Image.open(image)
+    original_format = pil_image.format
+    formats = list(dict.fromkeys([original_format, *formats]))
+
+    sizes = sorted(set(sizes), reverse=True)
+    pil_image.draft(None, (sizes[0], sizes[0]))
+    current = crop_max_square(pil_image)
+
+    renditions = []
+    for size in sizes:
+        if current.width > size:
+            current = current.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        for file_format in formats:
+            output = current
+            if file_format == "JPEG" and output.mode not in ("RGB", "L"):
+                output = output.convert("RGB")
+
+            in_mem_file = BytesIO()
+            output.save(in_mem_file, format=file_format, quality=quality)
+            renditions.append(
+                IImageRendition(
+                    size=size,
+                    width=output.width,
+                    height=output.height,
+                    file_format=file_format,
+                    file_data=in_mem_file.getvalue(),
+                ),
+            )
+
+    return renditions
@@ -0,0 +1,82 @@
+import hashlib
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from fastapi_cache.decorator import cache
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.db.redis_pool import get_cache_redis_pool
+
+# Every tag has a version that is part of the keys of the responses built from it, bumping the
+# version drops all of them at once without scanning the cache. Tags are model table names.
+TAG_KEY_PREFIX = "fastapi-cache:tag"
+
+
+def get_tag_key(tag: str) -> str:
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+async def get_tag_versions(tags: tuple[str, ...]) -> list[int]:
+    if not tags:
+        return []
+    redis_client = Redis(connection_pool=get_cache_redis_pool())
+    versions = await redis_client.mget([get_tag_key(tag) for tag in tags])
+    return [int(version or 0) for version in versions]
+
+
+async def invalidate_cache_tags(*tags: str) -> None:
+    """Drops the cached responses of the tags, every API worker sees it at once."""
+    if not tags:
+        return
+    try:
+        redis_client = Redis(connection_pool=get_cache_redis_pool())
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for tag in dict.fromkeys(tags):
+                pipe.incr(get_tag_key(tag))
+            await pipe.execute()
+    except RedisError as e:
+        # The responses expire by themselves after RESPONSE_CACHE_EXPIRE_SECONDS
+        logger.warning(f"Not able to invalidate the cache tags {tags}: '{e}'")
+
+
+async def tagged_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Request | None = None,
+    response: Response | None = None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    tags: tuple[str, ...],
+    per_user: bool,
+) -> str:
+    """Keys a response by its URL, the versions of its tags and, if asked, the current user."""
+    parts = [f"{func.__module__}:{func.__name__}"]
+    if request is not None:
+        parts.append(request.url.path)
+        parts.append(str(sorted(request.query_params.multi_items())))
+    versions = await get_tag_versions(tags)
+    parts.extend(f"{tag}={version}" for tag, version in zip(tags, versions, strict=True))
+    if per_user:
+        parts.append(f"user={kwargs['current_user'].id}")
+
+    cache_key = hashlib.md5(":".join(parts).encode()).hexdigest()  # noqa: S324
+    return f"{namespace}:{cache_key}"
+
+
+def cached(*tags: str, per_user: bool = False, expire: int | None = None) -> Callable:
+    """Caches the response of a GET endpoint until one of `tags` is invalidated.
+
+    Endpoints returning data that depends on who asks must set `per_user`, they need a
+    `current_user` parameter.
+    """
+    return cache(
+        expire=expire or settings.srv.RESPONSE_CACHE_EXPIRE_SECONDS,
+        key_builder=partial(tagged_key_builder, tags=tags, per_user=per_user),
+    )
@@ -1,34 +1,262 @@
-from datetime import timedelta
+from hashlib import sha256
+from time import time
+from typing import Any, NamedTuple
 from uuid import UUID
 
+import jwt
 from redis.asyncio import Redis
 
-from app.models.user_model import User
+from app.core.config import settings
+from app.core.security import decode_token
 from app.schemas.common_schema import TokenType
 
+# Tokens of a user are tracked by id in a sorted set scored by their expiry. A tracked set only
+# grows on login, so that is where expired ids are pruned, and the key itself lives as long as
+# its latest token.
+#
+# Earlier releases stored the raw tokens in one set per token type, and a user with such a set
+# is still tracked. The scripts get the legacy key of every sorted set after them in KEYS and
+# return LEGACY_TOKENS_FOUND when one must be translated before the call.
+LEGACY_TOKENS_FOUND = -1
 
-async def add_token_to_redis(
+ADD_TRACKED_FUNCTION = """
+local function has_legacy_tokens(count)
+    for i = 1, count do
+        if redis.call('EXISTS', KEYS[i]) == 0 and redis.call('EXISTS', KEYS[count + i]) == 1 then
+            return true
+        end
+    end
+    return false
+end
+
+local function add_if_tracked(key, token_id, expires_at, now)
+    if redis.call('EXISTS', key) == 0 then
+        return
+    end
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', '(' .. now)
+    redis.call('ZADD', key, expires_at, token_id)
+    if redis.call('TTL', key) < expires_at - now then
+        redis.call('EXPIREAT', key, expires_at)
+    end
+end
+"""
+
+# Adds each token of ARGV[2..] (id, expiry pairs) to its set only when the set exists, tokens
+# are tracked once a set was created
+ADD_IF_TRACKED_SCRIPT = (
+    ADD_TRACKED_FUNCTION
+    + """
+local count = #KEYS / 2
+if has_legacy_tokens(count) then
+    return -1
+end
+local now = tonumber(ARGV[1])
+for i = 1, count do
+    add_if_tracked(KEYS[i], ARGV[2 * i], tonumber(ARGV[2 * i + 1]), now)
+end
+return 1
+"""
+)
+
+# Checks the token id ARGV[1] against the set KEYS[1], then adds the tokens of ARGV[4..] to the
+# tracked sets KEYS[2..]. A missing set accepts any token unless ARGV[2] is '1'.
+VALIDATE_AND_ADD_SCRIPT = (
+    ADD_TRACKED_FUNCTION
+    + """
+local count = #KEYS / 2
+if has_legacy_tokens(count) then
+    return -1
+end
+local now = tonumber(ARGV[3])
+local expires_at = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if expires_at then
+    if tonumber(expires_at) < now then
+        return 0
+    end
+elseif ARGV[2] == '1' or redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 2, count do
+    add_if_tracked(KEYS[i], ARGV[2 * i], tonumber(ARGV[2 * i + 1]), now)
+end
+return 1
+"""
+)
+
+
+# Creates the sorted set KEYS[1] from the ids of ARGV (id, expiry pairs) unless it exists, and
+# drops the legacy set KEYS[2]
+TRANSLATE_LEGACY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 and redis.call('EXISTS', KEYS[2]) == 1 then
+    local expires_at = 0
+    for i = 1, #ARGV, 2 do
+        redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+        expires_at = math.max(expires_at, tonumber(ARGV[i + 1]))
+    end
+    redis.call('EXPIREAT', KEYS[1], expires_at)
+end
+redis.call('DEL', KEYS[2])
+return 1
+"""
+
+
+# Only member of a set whose tokens were all revoked, it keeps the user tracked, and the revoked
+# tokens rejected, until they expired
+REVOKED_TOKEN_ID = "revoked"
+
+
+class TokenGrant(NamedTuple):
+    token_type: TokenType
+    token_id: str
+    expires_at: int
+
+    @classmethod
+    def from_token(cls, token_type: TokenType, token: str) -> "TokenGrant":
+        payload = decode_token(token)
+        return cls(token_type, get_token_id(token, payload), payload["exp"])
+
+
+def get_token_key(user_id: UUID | str, token_type: TokenType) -> str:
+    return f"user:{user_id}:{token_type.value}:ids"
+
+
+def get_legacy_token_key(user_id: UUID | str, token_type: TokenType) -> str:
+    """Returns the key of the raw tokens stored by the releases before the sorted sets."""
+    return f"user:{user_id}:{token_type!s}"
+
+
+def get_token_lifetime(token_type: TokenType) -> int:
+    """Returns the longest lifetime of a token of `token_type` in seconds."""
+    minutes = {
+        TokenType.ACCESS: settings.srv.ACCESS_TOKEN_EXPIRE_MINUTES,
+        TokenType.REFRESH: settings.srv.REFRESH_TOKEN_EXPIRE_MINUTES,
+        TokenType.RESET: settings.srv.RESET_TOKEN_EXPITE_MINUTES,
+    }[token_type]
+    return minutes * 60
+
+
+def get_token_id(token: str, payload: dict[str, Any]) -> str:
+    """Returns the `jti` claim, tokens issued without one are identified by their hash."""
+    return payload.get("jti") or sha256(token.encode()).hexdigest()
+
+
+def _grant_args(grants: tuple[TokenGrant, ...]) -> list[str | int]:
+    return [arg for grant in grants for arg in (grant.token_id, grant.expires_at)]
+
+
+async def translate_legacy_tokens(
     redis_client: Redis,
-    user: User,
-    token: str,
-    token_type: TokenType,
-    expire_time: int | None = None,
+    user_id: UUID | str,
+    *token_types: TokenType,
+) -> None:
+    """Moves the raw tokens of the legacy sets to the sorted sets by id.
+
+    Expired tokens are dropped. A set left without tokens keeps the user tracked with
+    REVOKED_TOKEN_ID, so the tokens revoked before the translation stay rejected.
+    """
+    script = redis_client.register_script(TRANSLATE_LEGACY_SCRIPT)
+    for token_type in token_types:
+        legacy_key = get_legacy_token_key(user_id, token_type)
+        grants = []
+        for token in await redis_client.smembers(legacy_key):
+            try:
+                grants.append(TokenGrant.from_token(token_type, token))
+            except jwt.PyJWTError:
+                continue
+        if not grants:
+            expires_at = int(time()) + get_token_lifetime(token_type)
+            grants.append(TokenGrant(token_type, REVOKED_TOKEN_ID, expires_at))
+        await script(
+            keys=[get_token_key(user_id, token_type), legacy_key],
+            args=_grant_args(tuple(grants)),
+        )
+
+
+async def _run_tracking_script(
+    redis_client: Redis,
+    source: str,
+    user_id: UUID | str,
+    token_types: list[TokenType],
+    args: list[str | int],
+) -> int:
+    """Runs a script over the sets of `token_types`, translating legacy sets it found first."""
+    keys = [
+        *(get_token_key(user_id, token_type) for token_type in token_types),
+        *(get_legacy_token_key(user_id, token_type) for token_type in token_types),
+    ]
+    script = redis_client.register_script(source)
+    result = await script(keys=keys, args=args)
+    if result == LEGACY_TOKENS_FOUND:
+        await translate_legacy_tokens(redis_client, user_id, *token_types)
+        result = await script(keys=keys, args=args)
+    return result
+
+
+async def add_tokens_if_tracked(
+    redis_client: Redis,
+    user_id: UUID | str,
+    *grants: TokenGrant,
 ) -> None:
-    token_key = f"user:{user.id}:{token_type}"
-    valid_tokens = await get_valid_tokens(redis_client, user.id, token_type)
-    await redis_client.sadd(token_key, token)
-    if not valid_tokens:
-        await redis_client.expire(token_key, timedelta(minutes=expire_time))
+    """Adds the tokens of one user to their sets in a single round trip, see ADD_IF_TRACKED."""
+    await _run_tracking_script(
+        redis_client,
+        ADD_IF_TRACKED_SCRIPT,
+        user_id,
+        [grant.token_type for grant in grants],
+        [int(time()), *_grant_args(grants)],
+    )
+
+
+async def validate_token(
+    redis_client: Redis,
+    user_id: UUID | str,
+    token_type: TokenType,
+    token_id: str,
+    *grants: TokenGrant,
+    required: bool = False,
+) -> bool:
+    """Checks a token by id and adds the granted tokens in a single round trip.
+
+    A user without tokens of `token_type` is accepted unless `required` is set, the granted
+    tokens are only added when it is valid.
+    """
+    is_valid = await _run_tracking_script(
+        redis_client,
+        VALIDATE_AND_ADD_SCRIPT,
+        user_id,
+        [token_type, *(grant.token_type for grant in grants)],
+        [token_id, int(required), int(time()), *_grant_args(grants)],
+    )
+    return is_valid == 1
+
 
+async def replace_tokens(redis_client: Redis, user_id: UUID | str, *grants: TokenGrant) -> None:
+    """Revokes the tokens of the granted types and tracks the new ones in one transaction."""
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for grant in grants:
+            pipe.delete(
+                get_token_key(user_id, grant.token_type),
+                get_legacy_token_key(user_id, grant.token_type),
+            )
+        for grant in grants:
+            token_key = get_token_key(user_id, grant.token_type)
+            pipe.zadd(token_key, {grant.token_id: grant.expires_at})
+            pipe.expireat(token_key, grant.expires_at)
+        await pipe.execute()
 
-async def get_valid_tokens(redis_client: Redis, user_id: UUID, token_type: TokenType) -> set:
-    token_key = f"user:{user_id}:{token_type}"
-    valid_tokens = await redis_client.smembers(token_key)
-    return valid_tokens
 
+async def revoke_tokens(redis_client: Redis, user_id: UUID | str, *token_types: TokenType) -> None:
+    """Revokes every token of the types in one transaction.
 
-async def delete_tokens(redis_client: Redis, user: User, token_type: TokenType) -> None:
-    token_key = f"user:{user.id}:{token_type}"
-    valid_tokens = await redis_client.smembers(token_key)
-    if valid_tokens is not None:
-        await redis_client.delete(token_key)
+    Deleting the sets would accept any token of an untracked user, so they are replaced by
+    one member living as long as the revoked tokens.
+    """
+    now = int(time())
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for token_type in token_types:
+            token_key = get_token_key(user_id, token_type)
+            expires_at = now + get_token_lifetime(token_type)
+            pipe.delete(token_key, get_legacy_token_key(user_id, token_type))
+            pipe.zadd(token_key, {REVOKED_TOKEN_ID: expires_at})
+            pipe.expireat(token_key, expires_at)
+        await pipe.execute()
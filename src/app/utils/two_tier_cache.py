@@ -0,0 +1,118 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.utils.ttl_cache import TTLCache
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Returns the current generation of a namespace with the entry stored under it in one call
+GET_SCRIPT = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+return {generation, redis.call('HGET', KEYS[2] .. ':' .. generation, ARGV[1])}
+"""
+
+caches: dict[str, "TwoTierCache"] = {}
+# Caches kept only in process, called with the key sent by `publish_invalidation` or with None
+# to drop every entry
+local_caches: dict[str, Callable[[str | None], None]] = {}
+
+
+class TwoTierCache:
+    """Reference data cached in every process (L1) in front of Redis (L2).
+
+    Entries live in a Redis hash per generation of the namespace. Invalidating bumps the
+    generation, so a value loaded from the database before the change can not be written back
+    under the new one, and tells every process over pub/sub to clear its L1.
+
+    Args:
+        namespace (str): Name of the cache, also the message sent on invalidation.
+        ttl (float): Lifetime of L1 entries, bounds staleness if a message is missed.
+        maxsize (int): Maximum number of L1 entries.
+        redis_ttl (int): Lifetime of a generation in Redis.
+    """
+
+    def __init__(self, namespace: str, ttl: float, maxsize: int, redis_ttl: int) -> None:
+        self.namespace = namespace
+        self.redis_ttl = redis_ttl
+        self.local: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.local_generation = 0
+        self.generation_key = f"cache:{namespace}:generation"
+        self.entries_key = f"cache:{namespace}"
+        caches[namespace] = self
+
+    async def get_or_load(
+        self,
+        redis_client: Redis,
+        key: str,
+        loader: Callable[[], Awaitable[dict[str, Any] | None]],
+    ) -> dict[str, Any] | None:
+        """Returns the entry from L1, then L2, then `loader`, missing entries are not cached."""
+        if (value := self.local.get(key)) is not None:
+            return value
+
+        local_generation = self.local_generation
+        script = redis_client.register_script(GET_SCRIPT)
+        generation, raw = await script(keys=[self.generation_key, self.entries_key], args=[key])
+        if raw is not None:
+            value = json.loads(raw)
+        else:
+            value = await loader()
+            if value is None:
+                return None
+            entries_key = f"{self.entries_key}:{generation}"
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(entries_key, key, json.dumps(value))
+                pipe.expire(entries_key, self.redis_ttl)
+                await pipe.execute()
+
+        # An invalidation received meanwhile makes the value possibly stale
+        if self.local_generation == local_generation:
+            self.local.set(key, value)
+        return value
+
+    def clear_local(self) -> None:
+        self.local_generation += 1
+        self.local.clear()
+
+    async def invalidate(self, redis_client: Redis) -> None:
+        """Drops the entries everywhere, call it after committing a change."""
+        self.clear_local()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(self.generation_key)
+            pipe.publish(INVALIDATION_CHANNEL, self.namespace)
+            await pipe.execute()
+
+
+async def publish_invalidation(redis_client: Redis, namespace: str, key: str) -> None:
+    """Tells every process to drop `key` from the local cache registered as `namespace`."""
+    await redis_client.publish(INVALIDATION_CHANNEL, f"{namespace}:{key}")
+
+
+async def listen_for_invalidations(redis_client: Redis, retry_interval: float = 1.0) -> None:
+    """Clears the L1 of the caches invalidated by other processes, runs until cancelled."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Messages sent while not subscribed are lost
+                for cache in caches.values():
+                    cache.clear_local()
+                for invalidate in local_caches.values():
+                    invalidate(None)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    namespace, _, key = message["data"].partition(":")
+                    if cache := caches.get(namespace):
+                        cache.clear_local()
+                    elif invalidate := local_caches.get(namespace):
+                        invalidate(key)
+        except RedisError as e:
+            logger.warning(f"Cache invalidation listener disconnected: '{e}'")
+            await asyncio.sleep(retry_interval)
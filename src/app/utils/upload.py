@@ -0,0 +1,184 @@
+import asyncio
+import os
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from hashlib import sha256
+from io import BytesIO
+from typing import ParamSpec, TypeVar
+
+from fastapi import UploadFile
+
+from app import repository
+from app.core.config import settings
+from app.models.image_media_model import ImageMedia
+from app.models.image_rendition_model import ImageRendition
+from app.models.media_model import Media
+from app.utils.exceptions import FileTooLargeException, UploadsBusyException
+from app.utils.minio_client import IMinioResponse, MinioClient
+from app.utils.resize_image import IModifiedImageResponse, probe_image, sanitize_image
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Pillow and the MinIO client are blocking, they run here instead of on the event loop
+upload_executor = ThreadPoolExecutor(
+    max_workers=settings.file_storage.UPLOAD_WORKERS,
+    thread_name_prefix="upload",
+)
+upload_semaphore = asyncio.Semaphore(settings.file_storage.UPLOAD_MAX_CONCURRENCY)
+
+
+@asynccontextmanager
+async def upload_slot() -> AsyncIterator[None]:
+    """Limits the uploads processed at once, waiting too long for a slot answers 503."""
+    try:
+        await asyncio.wait_for(
+            upload_semaphore.acquire(),
+            timeout=settings.file_storage.UPLOAD_QUEUE_TIMEOUT_SECONDS,
+        )
+    except TimeoutError:
+        raise UploadsBusyException()
+
+    try:
+        yield
+    finally:
+        upload_semaphore.release()
+
+
+async def run_in_upload_executor(func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(upload_executor, partial(func, *args, **kwargs))
+
+
+async def read_upload(
+    upload: UploadFile,
+    max_size: int = settings.file_storage.UPLOAD_MAX_SIZE_BYTES,
+    chunk_size: int = settings.file_storage.UPLOAD_CHUNK_SIZE_BYTES,
+) -> tuple[bytes, str]:
+    """Reads the upload in chunks without blocking the event loop, rejecting oversized files.
+
+    Returns the content with its sha256 hex digest, computed while reading.
+    """
+    buffer = BytesIO()
+    digest = sha256()
+    while chunk := await upload.read(chunk_size):
+        if buffer.tell() + len(chunk) > max_size:
+            raise FileTooLargeException(max_size=max_size)
+        buffer.write(chunk)
+        digest.update(chunk)
+    return buffer.getvalue(), digest.hexdigest()
+
+
+def process_and_store_image(
+    minio_client: MinioClient,
+    image_data: bytes,
+    file_name: str,
+    content_type: str | None,
+) -> tuple[IModifiedImageResponse, IMinioResponse]:
+    if settings.file_storage.UPLOAD_SANITIZE_IMAGES:
+        image_modified = sanitize_image(
+            image_data,
+            max_dimension=settings.file_storage.UPLOAD_MAX_IMAGE_DIMENSION,
+        )
+    else:
+        image_modified = probe_image(image_data)
+    data_file = minio_client.put_object(
+        file_name=file_name,
+        file_data=BytesIO(image_modified.file_data),
+        content_type=content_type,
+    )
+    return image_modified, data_file
+
+
+async def store_image(
+    minio_client: MinioClient,
+    image_data: bytes,
+    file_name: str,
+    content_type: str | None,
+) -> tuple[IModifiedImageResponse, IMinioResponse]:
+    """Probes or sanitizes and uploads an image in the upload executor."""
+    return await run_in_upload_executor(
+        process_and_store_image,
+        minio_client,
+        image_data,
+        file_name,
+        content_type,
+    )
+
+
+def copy_image(
+    image: ImageMedia,
+    title: str | None = None,
+    description: str | None = None,
+) -> ImageMedia:
+    """Returns a new image sharing the stored objects of `image`, its renditions included."""
+    copy = ImageMedia(
+        media=Media(
+            title=title,
+            description=description,
+            path=image.media.path,
+            content_hash=image.media.content_hash,
+        ),
+        height=image.height,
+        width=image.width,
+        file_format=image.file_format,
+    )
+    copy.renditions = [
+        ImageRendition(
+            image_media_id=copy.id,
+            media=Media(title="", description="", path=rendition.media.path),
+            size=rendition.size,
+            file_format=rendition.file_format,
+            width=rendition.width,
+            height=rendition.height,
+        )
+        for rendition in image.renditions
+    ]
+    return copy
+
+
+async def save_image_upload(
+    minio_client: MinioClient,
+    upload: UploadFile,
+    title: str | None = None,
+    description: str | None = None,
+) -> tuple[ImageMedia, bool]:
+    """Stores an uploaded image under its content hash while holding an upload slot.
+
+    An image with the same content gets its own rows with the given title and description
+    but shares the stored object and renditions, so a repeated upload costs a hash and two
+    lookups. Returns the image and whether its object was stored, needing renditions.
+    """
+    async with upload_slot():
+        image_data, content_hash = await read_upload(upload)
+        if image := await repository.image.get_by_content_hash(content_hash=content_hash):
+            await repository.image.load_renditions(images=[image])
+            return copy_image(image, title, description), False
+
+        file_extension = os.path.splitext(upload.filename or "")[-1].lower()
+        image_modified, data_file = await store_image(
+            minio_client,
+            image_data,
+            f"{content_hash}{file_extension}",
+            upload.content_type,
+        )
+
+    media = Media(
+        title=title,
+        description=description,
+        path=data_file.file_name,
+        content_hash=content_hash,
+    )
+    image = ImageMedia(
+        media=media,
+        height=image_modified.height,
+        width=image_modified.width,
+        file_format=image_modified.file_format,
+    )
+    return image, True
+
+
+def shutdown_upload_executor() -> None:
+    upload_executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,209 @@
+"""Drives concurrent clients against the auth endpoints and an authenticated GET.
+
+Runs the application in-process, reports throughput, latency percentiles and the event loop
+lag of every endpoint. Needs the Postgres database configured by the environment, Redis is
+replaced by fakeredis with `--fake-redis`. The seeded users are removed at the end:
+
+    python -m tests.benchmarks.auth_load --users 20 --concurrency 20 --output out.json
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from typing import Any
+
+import bcrypt
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import delete, insert
+
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import User
+from app.utils.password_hasher import password_hasher
+from app.utils.uuid6 import uuid7
+from tests.benchmarks.utils import summarize, write_report
+
+PASSWORD = "bench-password"
+AUTH_PREFIX = f"{settings.srv.API_PREFIX}/auth"
+
+Request = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+async def seed_users(count: int, rounds: int) -> list[dict[str, Any]]:
+    # One hash for every user, its cost is what the login scenarios measure
+    hashed_password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+    users = [
+        {
+            "id": uuid7(),
+            "first_name": "Bench",
+            "last_name": str(i),
+            "email": f"bench-{uuid7()}@example.com",
+            "username": f"bench-{uuid7()}",
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_superuser": False,
+        }
+        for i in range(count)
+    ]
+    async with SessionLocal() as db_session:
+        await db_session.execute(insert(User), users)
+        await db_session.commit()
+    return users
+
+
+async def cleanup_users(users: list[dict[str, Any]]) -> None:
+    async with SessionLocal() as db_session:
+        await db_session.execute(delete(User).where(User.id.in_([user["id"] for user in users])))
+        await db_session.commit()
+
+
+async def login_all(client: AsyncClient, users: list[dict[str, Any]]) -> list[dict[str, str]]:
+    tokens = []
+    for user in users:
+        response = await client.post(
+            f"{AUTH_PREFIX}/login",
+            json={"email": user["email"], "password": PASSWORD},
+        )
+        response.raise_for_status()
+        tokens.append(response.json()["data"])
+    return tokens
+
+
+def build_requests(
+    users: list[dict[str, Any]],
+    tokens: list[dict[str, str]],
+) -> dict[str, Request]:
+    def user_at(i: int) -> dict[str, Any]:
+        return users[i % len(users)]
+
+    def token_at(i: int) -> dict[str, str]:
+        return tokens[i % len(tokens)]
+
+    return {
+        "login": lambda client, i: client.post(
+            f"{AUTH_PREFIX}/login",
+            json={"email": user_at(i)["email"], "password": PASSWORD},
+        ),
+        "token": lambda client, i: client.post(
+            f"{AUTH_PREFIX}/token",
+            data={"username": user_at(i)["email"], "password": PASSWORD},
+        ),
+        "refresh-token": lambda client, i: client.post(
+            f"{AUTH_PREFIX}/refresh-token",
+            json={"refresh_token": token_at(i)["refresh_token"]},
+        ),
+        "me": lambda client, i: client.get(
+            f"{settings.srv.API_PREFIX}/user",
+            headers={"Authorization": f"Bearer {token_at(i)['access_token']}"},
+        ),
+    }
+
+
+async def run_scenario(
+    client: AsyncClient,
+    request: Request,
+    requests: int,
+    concurrency: int,
+    lag_interval: float,
+) -> dict[str, Any]:
+    samples: list[float] = []
+    lags: list[float] = []
+    statuses: Counter[int] = Counter()
+    counter = iter(range(requests))
+    finished = asyncio.Event()
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            response = await request(client, i)
+            samples.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    async def probe() -> None:
+        # How late the loop wakes a sleeping task, i.e. how long handlers kept it blocked
+        while not finished.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(lag_interval)
+            lags.append(max(0.0, time.perf_counter() - start - lag_interval))
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    finished.set()
+    await prober
+
+    return {
+        "requests": len(samples),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "statuses": dict(statuses),
+        "latency": summarize(samples),
+        "loop_lag": summarize(lags),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    report: dict[str, Any] = {
+        "users": args.users,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "bcrypt_rounds": args.bcrypt_rounds,
+        "fake_redis": args.fake_redis,
+        "results": {},
+    }
+
+    async with AsyncExitStack() as stack:
+        if args.fake_redis:
+            from fakeredis import FakeAsyncRedis
+
+            redis_client = FakeAsyncRedis(decode_responses=True)
+            app.dependency_overrides[deps.get_redis_client] = lambda: redis_client
+        else:
+            await stack.enter_async_context(app.router.lifespan_context(app))
+
+        users = await seed_users(args.users, args.bcrypt_rounds)
+        stack.push_async_callback(cleanup_users, users)
+
+        transport = ASGITransport(app=app)
+        client = await stack.enter_async_context(
+            AsyncClient(transport=transport, base_url="http://bench"),
+        )
+        tokens = await login_all(client, users)
+
+        for name, request in build_requests(users, tokens).items():
+            if args.endpoints and name not in args.endpoints:
+                continue
+            report["results"][name] = await run_scenario(
+                client,
+                request,
+                args.requests,
+                args.concurrency,
+                args.lag_interval,
+            )
+
+    report["password_hasher"] = password_hasher.get_stats()
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--lag-interval", type=float, default=0.005)
+    parser.add_argument(
+        "--endpoints",
+        nargs="*",
+        choices=["login", "token", "refresh-token", "me"],
+        default=None,
+    )
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--output", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,154 @@
+"""Measures the latency of an unrelated endpoint while images are uploaded in parallel.
+
+Compares the former inline upload handler with the upload executor path. Runs in-process
+without MinIO, the storage round trip is simulated with a blocking sleep:
+
+    python -m tests.benchmarks.image_upload --uploads 16 --output out.json
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from io import BytesIO
+
+from fastapi import FastAPI, File, UploadFile
+from httpx import ASGITransport, AsyncClient
+from PIL import Image
+
+from app.utils.minio_client import IMinioResponse
+from app.utils.upload import (
+    process_and_store_image,
+    read_upload,
+    shutdown_upload_executor,
+    store_image,
+    upload_slot,
+)
+from tests.benchmarks.utils import summarize, write_report
+
+
+class FakeStorage:
+    """Stands in for MinioClient, `put_object` blocks like the real HTTP upload."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    def put_object(self, file_data: BytesIO, file_name: str, content_type: str) -> IMinioResponse:
+        file_data.read()
+        time.sleep(self.latency)
+        return IMinioResponse(bucket_name="bench", file_name=file_name, url="")
+
+
+def make_image(side: int) -> bytes:
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def create_app(storage: FakeStorage) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.post("/inline")
+    async def upload_inline(image_file: UploadFile = File(...)) -> dict[str, str]:
+        """The former handler: read, re-encode and upload on the event loop."""
+        _, data_file = process_and_store_image(
+            storage,
+            image_file.file.read(),
+            image_file.filename,
+            image_file.content_type,
+        )
+        return {"file_name": data_file.file_name}
+
+    @app.post("/executor")
+    async def upload_executor(image_file: UploadFile = File(...)) -> dict[str, str]:
+        async with upload_slot():
+            image_data, _ = await read_upload(image_file)
+            _, data_file = await store_image(
+                storage,
+                image_data,
+                image_file.filename,
+                image_file.content_type,
+            )
+        return {"file_name": data_file.file_name}
+
+    return app
+
+
+async def run_scenario(
+    client: AsyncClient,
+    path: str,
+    image: bytes,
+    uploads: int,
+    ping_interval: float,
+) -> dict:
+    ping_samples: list[float] = []
+    upload_samples: list[float] = []
+    statuses: Counter[int] = Counter()
+    finished = asyncio.Event()
+
+    async def upload() -> None:
+        start = time.perf_counter()
+        files = {"image_file": ("bench.jpg", image, "image/jpeg")}
+        response = await client.post(path, files=files)
+        upload_samples.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+    async def ping() -> None:
+        # Measured from the scheduled send time, so the time the event loop was blocked counts
+        scheduled = time.perf_counter()
+        while not finished.is_set():
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/ping")
+            ping_samples.append(time.perf_counter() - scheduled)
+            scheduled = max(scheduled + ping_interval, time.perf_counter())
+
+    pinger = asyncio.create_task(ping())
+    await asyncio.gather(*(upload() for _ in range(uploads)))
+    finished.set()
+    await pinger
+
+    return {
+        "ping": summarize(ping_samples),
+        "upload": summarize(upload_samples),
+        "statuses": dict(statuses),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    image = make_image(args.image_side)
+    app = create_app(FakeStorage(args.storage_latency))
+
+    report = {
+        "uploads": args.uploads,
+        "image_bytes": len(image),
+        "storage_latency_s": args.storage_latency,
+        "results": {},
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ("/inline", "/executor"):
+            report["results"][path.strip("/")] = await run_scenario(
+                client,
+                path,
+                image,
+                args.uploads,
+                args.ping_interval,
+            )
+
+    shutdown_upload_executor()
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=16)
+    parser.add_argument("--image-side", type=int, default=2000)
+    parser.add_argument("--storage-latency", type=float, default=0.05)
+    parser.add_argument("--ping-interval", type=float, default=0.005)
+    parser.add_argument("--output", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,154 @@
+"""Compares the default FastAPI response serialization with `create_json_response`.
+
+The default path is what FastAPI runs for an endpoint returning `create_response`: validation
+against the response model, `dump_python` and `json.dumps`. Runs in-process on detached models,
+presigned links are built by a fake storage without MinIO:
+
+    python -m tests.benchmarks.response_serialization --page-size 50 --output out.json
+"""
+
+import argparse
+import asyncio
+import json
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi_pagination import Page, Params
+
+from app.api import deps
+from app.models import ImageMedia, Media, Task, User
+from app.models.image_rendition_model import ImageRendition
+from app.schemas.response_schema import (
+    CursorPageBase,
+    IGetResponseBase,
+    IGetResponseCursorPaginated,
+    IGetResponsePaginated,
+    create_json_response,
+    create_response,
+)
+from app.schemas.task_schema import ITaskRead
+from app.schemas.user_schema import IUserRead
+from tests.benchmarks.utils import measure, summarize, write_report
+
+
+class FakeStorage:
+    """Stands in for MinioClient, `Media.link` presigns every path it serializes."""
+
+    def presigned_get_object(self, bucket_name: str, object_name: str) -> str:
+        return f"http://minio/{bucket_name}/{object_name}?X-Amz-Signature=bench"
+
+
+def make_media(path: str) -> Media:
+    return Media(title=path, description="", path=path)
+
+
+def make_user(i: int, rendition_sizes: list[int]) -> User:
+    image = ImageMedia(file_format="JPEG", width=1024, height=1024, media=make_media(f"{i}.jpg"))
+    image.renditions = [
+        ImageRendition(
+            image_media_id=image.id,
+            size=size,
+            file_format="WEBP",
+            width=size,
+            height=size,
+            media=make_media(f"{i}-{size}.webp"),
+        )
+        for size in rendition_sizes
+    ]
+    return User(
+        first_name="Bench",
+        last_name=str(i),
+        email=f"bench-{i}@example.com",
+        username=f"bench-{i}",
+        hashed_password="-",
+        image=image,
+    )
+
+
+def build_scenarios(page_size: int, rendition_sizes: list[int]) -> dict[str, tuple[Any, Any]]:
+    """Response type and data of every compared endpoint shape."""
+    users = [make_user(i, rendition_sizes) for i in range(page_size)]
+    tasks = [Task(name=f"task {i}", done=i % 2 == 0) for i in range(page_size)]
+    params = Params(page=1, size=page_size)
+    return {
+        "user": (IGetResponseBase[IUserRead], users[0]),
+        "users_page": (
+            IGetResponsePaginated[IUserRead],
+            Page.create(items=users, params=params, total=page_size * 10),
+        ),
+        "users_cursor_page": (
+            IGetResponseCursorPaginated[IUserRead],
+            CursorPageBase(items=users, size=page_size, next_cursor="bench"),
+        ),
+        "tasks_page": (
+            IGetResponsePaginated[ITaskRead],
+            Page.create(items=tasks, params=params, total=page_size * 10),
+        ),
+    }
+
+
+def default_path(response_type: Any) -> Callable[[Any], Any]:
+    async def endpoint() -> response_type: ...
+
+    field = APIRoute("/", endpoint).response_field
+
+    async def render(data: Any) -> bytes:
+        content = await serialize_response(field=field, response_content=create_response(data))
+        return JSONResponse(content).body
+
+    return render
+
+
+def fast_path(response_type: Any) -> Callable[[Any], Any]:
+    async def render(data: Any) -> bytes:
+        return create_json_response(response_type, data).body
+
+    return render
+
+
+async def main(args: argparse.Namespace) -> None:
+    deps.minio_auth = FakeStorage
+    report: dict[str, Any] = {
+        "page_size": args.page_size,
+        "rendition_sizes": args.rendition_sizes,
+        "repeat": args.repeat,
+        "results": {},
+    }
+
+    for name, (response_type, data) in build_scenarios(
+        args.page_size,
+        args.rendition_sizes,
+    ).items():
+        default_render = default_path(response_type)
+        fast_render = fast_path(response_type)
+        default_body = await default_render(data)
+        fast_body = await fast_render(data)
+
+        default_samples = await measure(
+            lambda render=default_render, data=data: render(data),
+            args.repeat,
+        )
+        fast_samples = await measure(
+            lambda render=fast_render, data=data: render(data),
+            args.repeat,
+        )
+        report["results"][name] = {
+            "bytes": len(fast_body),
+            "identical": json.loads(default_body) == json.loads(fast_body),
+            "default": summarize(default_samples),
+            "fast": summarize(fast_samples),
+            "speedup": sum(default_samples) / sum(fast_samples),
+        }
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--rendition-sizes", type=int, nargs="*", default=[64, 256])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,134 @@
+"""Compares the task listing of the current user with and without the project id prefetch.
+
+Needs a Postgres database, the seeded rows are removed at the end:
+
+    python -m tests.benchmarks.task_listing --database-url postgresql+asyncpg://... --output out.json
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models import Project, ProjectUserLink, Task, User
+from app.repository import task as task_repository
+from app.utils.uuid6 import uuid7
+from tests.benchmarks.utils import measure, summarize, write_report
+
+PAGE_SIZE = 50
+
+
+async def seed_user(db_session: AsyncSession, projects_count: int, tasks_per_project: int) -> User:
+    user = User(
+        first_name="Bench",
+        last_name=str(projects_count),
+        email=f"bench-{uuid7()}@example.com",
+        username=f"bench-{uuid7()}",
+        hashed_password="-",
+    )
+    db_session.add(user)
+    await db_session.flush()
+
+    project_ids = [uuid7() for _ in range(projects_count)]
+    await db_session.execute(
+        insert(Project),
+        [
+            {"id": project_id, "name": f"p{i}", "description": "", "link": ""}
+            for i, project_id in enumerate(project_ids)
+        ],
+    )
+    await db_session.execute(
+        insert(ProjectUserLink),
+        [{"project_id": project_id, "user_id": user.id} for project_id in project_ids],
+    )
+    await db_session.execute(
+        insert(Task),
+        [
+            {"id": uuid7(), "name": f"t{i}", "done": False, "project_id": project_id}
+            for project_id in project_ids
+            for i in range(tasks_per_project)
+        ],
+    )
+    await db_session.commit()
+    return user
+
+
+async def cleanup_user(db_session: AsyncSession, user: User) -> None:
+    project_ids = select(ProjectUserLink.project_id).where(ProjectUserLink.user_id == user.id)
+    project_ids = (await db_session.execute(project_ids)).scalars().all()
+    await db_session.execute(delete(Task).where(Task.project_id.in_(project_ids)))
+    await db_session.execute(delete(ProjectUserLink).where(ProjectUserLink.user_id == user.id))
+    await db_session.execute(delete(Project).where(Project.id.in_(project_ids)))
+    await db_session.execute(delete(User).where(User.id == user.id))
+    await db_session.commit()
+
+
+async def list_with_prefetch(db_session: AsyncSession, user: User) -> None:
+    """The former implementation: project ids first, then `IN (...)`."""
+    response = await db_session.execute(select(Project.id).where(Project.users.contains(user)))
+    projects = response.scalars().all()
+    query = (
+        select(Task.id, Task.name, Task.deadline, Task.done, Task.project_id, Project.name)
+        .where(Task.project_id.in_(projects))
+        .join(Project, Project.id == Task.project_id)
+        .order_by(Task.created_at)
+        .limit(PAGE_SIZE)
+    )
+    (await db_session.execute(query)).all()
+
+
+async def list_with_join(db_session: AsyncSession, user: User) -> None:
+    query = (
+        task_repository.get_user_tasks_query(user_id=user.id)
+        .order_by(Task.created_at)
+        .limit(PAGE_SIZE)
+    )
+    (await db_session.execute(query)).all()
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    report = {"page_size": PAGE_SIZE, "repeat": args.repeat, "results": {}}
+    async with AsyncSession(engine, expire_on_commit=False) as db_session:
+        for projects_count in args.projects:
+            user = await seed_user(db_session, projects_count, args.tasks_per_project)
+            try:
+                report["results"][projects_count] = {
+                    "prefetch": summarize(
+                        await measure(
+                            lambda user=user: list_with_prefetch(db_session, user),
+                            args.repeat,
+                        ),
+                    ),
+                    "join": summarize(
+                        await measure(
+                            lambda user=user: list_with_join(db_session, user),
+                            args.repeat,
+                        ),
+                    ),
+                }
+            finally:
+                await cleanup_user(db_session, user)
+
+    await engine.dispose()
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--database-url",
+        default=settings.database.ASYNC_DATABASE_URI.rsplit("/", 1)[0] + "/yuno-db-test",
+    )
+    parser.add_argument("--projects", type=int, nargs="+", default=[1, 100, 5000])
+    parser.add_argument("--tasks-per-project", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,45 @@
+import json
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict[str, float | int]:
+    """Latency summary in milliseconds of samples measured in seconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+
+
+async def measure(func: Callable[[], Awaitable[Any]], repeat: int, warmup: int = 3) -> list[float]:
+    for _ in range(warmup):
+        await func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def write_report(report: dict[str, Any], output: str | None) -> None:
+    content = json.dumps(report, indent=2, default=str)
+    if output:
+        Path(output).write_text(content + "\n")
+    print(content)
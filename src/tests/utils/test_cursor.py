@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.exceptions import InvalidCursorException
+from app.utils.uuid6 import uuid7
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 1, 12, 30), uuid7()]
+
+    assert decode_cursor(encode_cursor(values), size=2) == values
+
+
+@pytest.mark.parametrize("cursor", ["garbage", encode_cursor([1])])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, size=2)
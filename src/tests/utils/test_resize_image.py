@@ -0,0 +1,51 @@
+from io import BytesIO
+
+from PIL import Image
+
+from app.utils.resize_image import create_renditions, probe_image, sanitize_image
+
+
+def make_image(size: tuple[int, int], file_format: str, mode: str = "RGB") -> BytesIO:
+    image = BytesIO()
+    Image.new(mode, size).save(image, format=file_format)
+    image.seek(0)
+    return image
+
+
+def test_renditions_for_every_size_and_format():
+    renditions = create_renditions(make_image((1200, 800), "JPEG"), [64, 256], ["WEBP"])
+
+    assert [(r.size, r.file_format, r.width, r.height) for r in renditions] == [
+        (256, "JPEG", 256, 256),
+        (256, "WEBP", 256, 256),
+        (64, "JPEG", 64, 64),
+        (64, "WEBP", 64, 64),
+    ]
+    assert Image.open(BytesIO(renditions[1].file_data)).format == "WEBP"
+
+
+def test_renditions_are_not_upscaled():
+    renditions = create_renditions(make_image((100, 300), "PNG", mode="RGBA"), [128], ["JPEG"])
+
+    assert [(r.file_format, r.width) for r in renditions] == [("PNG", 100), ("JPEG", 100)]
+
+
+def test_probe_image_passes_the_original_through():
+    image_data = make_image((120, 80), "PNG").getvalue()
+
+    probed = probe_image(image_data)
+
+    assert (probed.width, probed.height, probed.file_format) == (120, 80, "PNG")
+    assert probed.file_data is image_data
+
+
+def test_sanitize_image_strips_exif_and_clamps():
+    exif = Image.Exif()
+    exif[0x0110] = "Camera"  # Model
+    image = BytesIO()
+    Image.new("RGB", (400, 200)).save(image, format="JPEG", exif=exif)
+
+    sanitized = sanitize_image(image.getvalue(), max_dimension=100)
+
+    assert (sanitized.width, sanitized.height, sanitized.file_format) == (100, 50, "JPEG")
+    assert not Image.open(BytesIO(sanitized.file_data)).getexif()
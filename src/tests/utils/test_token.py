@@ -0,0 +1,95 @@
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta
+from time import time
+from uuid import uuid4
+
+import jwt
+import pytest
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+from app.core.config import settings
+from app.db.redis_pool import create_redis_pool
+from app.schemas.common_schema import TokenType
+from app.utils.token import (
+    TokenGrant,
+    add_tokens_if_tracked,
+    get_legacy_token_key,
+    get_token_id,
+    get_token_key,
+    validate_token,
+)
+
+
+@pytest.fixture
+async def redis_client() -> AsyncGenerator[Redis, None]:
+    redis_client = Redis(connection_pool=create_redis_pool(2, decode_responses=True))
+    try:
+        await redis_client.ping()
+    except ConnectionError:
+        pytest.skip("Redis is not reachable")
+    yield redis_client
+    await redis_client.connection_pool.disconnect()
+
+
+@pytest.fixture
+async def user_id(redis_client: Redis) -> AsyncGenerator[str, None]:
+    user_id = str(uuid4())
+    yield user_id
+    keys = [
+        key
+        for token_type in TokenType
+        for key in (get_token_key(user_id, token_type), get_legacy_token_key(user_id, token_type))
+    ]
+    await redis_client.delete(*keys)
+
+
+def create_legacy_token(user_id: str, expires_delta: timedelta) -> str:
+    """Returns an access token as issued before the tokens had a `jti` claim."""
+    expire = datetime.utcnow() + expires_delta
+    return jwt.encode(
+        {"exp": expire, "sub": user_id, "type": "access"},
+        settings.srv.SECRET_KEY,
+        algorithm=settings.srv.JWT_ALGORITHM,
+    )
+
+
+def get_id(token: str) -> str:
+    return get_token_id(token, jwt.decode(token, options={"verify_signature": False}))
+
+
+async def test_token_revoked_before_the_legacy_set_translation_is_rejected(
+    redis_client: Redis,
+    user_id: str,
+):
+    revoked = create_legacy_token(user_id, timedelta(minutes=10))
+    current = create_legacy_token(user_id, timedelta(minutes=20))
+    await redis_client.sadd(get_legacy_token_key(user_id, TokenType.ACCESS), current)
+
+    assert not await validate_token(redis_client, user_id, TokenType.ACCESS, get_id(revoked))
+    assert await validate_token(redis_client, user_id, TokenType.ACCESS, get_id(current))
+    assert not await redis_client.exists(get_legacy_token_key(user_id, TokenType.ACCESS))
+
+
+async def test_legacy_set_of_expired_tokens_keeps_the_user_tracked(
+    redis_client: Redis,
+    user_id: str,
+):
+    expired = create_legacy_token(user_id, timedelta(minutes=-1))
+    await redis_client.sadd(get_legacy_token_key(user_id, TokenType.ACCESS), expired)
+
+    revoked = create_legacy_token(user_id, timedelta(minutes=10))
+    assert not await validate_token(redis_client, user_id, TokenType.ACCESS, get_id(revoked))
+
+
+async def test_login_of_user_with_legacy_set_is_tracked(redis_client: Redis, user_id: str):
+    current = create_legacy_token(user_id, timedelta(minutes=20))
+    await redis_client.sadd(get_legacy_token_key(user_id, TokenType.ACCESS), current)
+
+    grant = TokenGrant(TokenType.ACCESS, uuid4().hex, int(time()) + 600)
+    await add_tokens_if_tracked(redis_client, user_id, grant)
+
+    revoked = create_legacy_token(user_id, timedelta(minutes=10))
+    assert await validate_token(redis_client, user_id, TokenType.ACCESS, grant.token_id)
+    assert await validate_token(redis_client, user_id, TokenType.ACCESS, get_id(current))
+    assert not await validate_token(redis_client, user_id, TokenType.ACCESS, get_id(revoked))
@@ -0,0 +1,37 @@
+from app.utils import ttl_cache
+from app.utils.ttl_cache import TTLCache
+
+
+def test_get_returns_value_until_expired(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(ttl_cache, "monotonic", lambda: now)
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+
+    now = 105.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_delete_where_removes_matching_keys():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(("user-1", "token-a"), 1)
+    cache.set(("user-1", "token-b"), 2)
+    cache.set(("user-2", "token-a"), 3)
+
+    assert cache.delete_where(lambda key: key[0] == "user-1") == 2
+    assert cache.get(("user-2", "token-a")) == 3
@@ -0,0 +1,24 @@
+from hashlib import sha256
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+
+from app.utils.exceptions import FileTooLargeException
+from app.utils.upload import read_upload
+
+
+async def test_read_upload_in_chunks():
+    upload = UploadFile(BytesIO(b"x" * 10), filename="image.png")
+
+    content, content_hash = await read_upload(upload, max_size=10, chunk_size=3)
+
+    assert content == b"x" * 10
+    assert content_hash == sha256(b"x" * 10).hexdigest()
+
+
+async def test_read_upload_rejects_oversized_files():
+    upload = UploadFile(BytesIO(b"x" * 11), filename="image.png")
+
+    with pytest.raises(FileTooLargeException):
+        await read_upload(upload, max_size=10, chunk_size=3)